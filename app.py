@@ -1,13 +1,6 @@
+import os
 import streamlit as st
-import yfinance as yf
 from components.sidebar import create_sidebar
-from components.overview import show_company_overview
-from components.charts import show_price_charts
-from components.technical import show_technical_analysis
-from components.financials import show_financial_metrics
-from components.comparison import show_stock_comparison
-from components.portfolio import show_portfolio_analyzer
-from components.news import show_news_sentiment
 from components.utils import get_stock_info
 
 # Set page config
@@ -18,137 +11,43 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Add custom CSS
-st.markdown("""
-    <style>
-    /* Main app */
-    .main {
-        background-color: #0E1117;
-    }
-    
-    /* Sidebar */
-    .css-1d391kg {
-        background-color: #1E2127;
-        padding: 2rem 1rem;
-    }
-    
-    /* Headers */
-    h1, h2, h3 {
-        color: #E0E0E0;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        padding-top: 1rem;
-        padding-bottom: 1rem;
-    }
-    
-    h1 {
-        text-align: center;
-        background: linear-gradient(90deg, #1E88E5 0%, #1565C0 100%);
-        padding: 1rem;
-        border-radius: 10px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Tabs styling */
-    .stTabs {
-        background: transparent !important;
-        padding: 1rem 0;
-    }
-    
-    .stTabs [data-baseweb="tab-list"] {
-        background-color: #1E2127;
-        border-radius: 5px;
-        padding: 1rem;
-        margin-top: 1rem;
-    }
-    
-    /* Metrics styling */
-    div[data-testid="stMetricValue"] {
-        background-color: #262730;
-        padding: 1rem;
-        border-radius: 5px;
-        font-size: 1.5rem !important;
-        color: #E0E0E0 !important;
-    }
-    
-    /* Expander styling */
-    .streamlit-expanderHeader {
-        background-color: #262730;
-        border-radius: 5px;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background-color: #1565C0;
-        color: white;
-        border: none;
-        padding: 0.5rem 1rem;
-        border-radius: 5px;
-        font-weight: bold;
-    }
-    
-    .stButton > button:hover {
-        background-color: #1E88E5;
-        border: none;
-    }
-    
-    /* DataFrame styling */
-    .dataframe {
-        background-color: #262730;
-        border-radius: 5px;
-        padding: 1rem;
-    }
-    
-    /* Warning/Error/Info messages */
-    .stAlert {
-        background-color: #262730;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    /* Links */
-    a {
-        color: #1E88E5 !important;
-        text-decoration: none;
-    }
-    
-    a:hover {
-        color: #90CAF9 !important;
-        text-decoration: underline;
-    }
-    
-    /* Plotly chart background */
-    .js-plotly-plot {
-        background-color: #262730;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    /* Sidebar text */
-    .css-17lntkn {
-        color: #E0E0E0;
-    }
-    
-    /* Input fields */
-    .stTextInput > div > div {
-        background-color: #262730;
-        border-radius: 5px;
-        border: 1px solid #404040;
-        color: #E0E0E0;
-    }
-    
-    /* Select boxes */
-    .stSelectbox > div > div {
-        background-color: #262730;
-        border-radius: 5px;
-        border: 1px solid #404040;
-        color: #E0E0E0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+@st.cache_resource
+def load_css():
+    """Read the app stylesheet once per server process."""
+    with open(os.path.join(os.path.dirname(__file__), 'static', 'style.css')) as f:
+        return f.read()
+
+# Each tab renders inside its own fragment so widget interactions only rerun that tab.
+# Component modules are imported on first use so a session only loads the views it opens.
+@st.fragment
+def _overview_fragment(ticker_symbol, info):
+    from components.overview import show_company_overview
+    show_company_overview(ticker_symbol, info)
+
+@st.fragment
+def _charts_fragment(ticker_symbol, period):
+    from components.charts import show_price_charts
+    show_price_charts(ticker_symbol, period)
+
+@st.fragment
+def _technical_fragment(ticker_symbol, period, technical_indicators):
+    from components.technical import show_technical_analysis
+    show_technical_analysis(ticker_symbol, period, technical_indicators)
+
+@st.fragment
+def _financials_fragment(ticker_symbol, info):
+    from components.financials import show_financial_metrics
+    show_financial_metrics(ticker_symbol, info)
+
+@st.fragment
+def _news_fragment(ticker_symbol):
+    from components.news import show_news_sentiment
+    show_news_sentiment(ticker_symbol)
 
 def main():
+    # Add custom CSS
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+    
     # Create sidebar and get user inputs
     sidebar_inputs = create_sidebar()
     
@@ -159,9 +58,11 @@ def main():
     
     # Handle Compare Stocks and Portfolio Analysis independently
     if tab_selection == "Compare Stocks":
+        from components.comparison import show_stock_comparison
         show_stock_comparison()
         return
     elif tab_selection == "Portfolio Analysis":
+        from components.portfolio import show_portfolio_analyzer
         show_portfolio_analyzer()
         return
     
@@ -177,38 +78,43 @@ def main():
                     st.title(f"{info.get('longName', ticker_symbol)} ({ticker_symbol})")
             
                 if tab_selection == "Stock Analysis":
-                    # Create tabs for different analyses
+                    # Tabs track the active selection so only the visible tab's body runs
                     tabs = st.tabs([
                         "📊 Overview",
                         "📈 Charts",
                         "📉 Technical Analysis",
                         "💰 Financials",
                         "📰 News & Sentiment"
-                    ])
+                    ], on_change="rerun", key="analysis_tab")
                     
-                    with tabs[0]:
-                        show_company_overview(ticker_symbol, info)
+                    if tabs[0].open:
+                        with tabs[0]:
+                            _overview_fragment(ticker_symbol, info)
                     
-                    with tabs[1]:
-                        show_price_charts(ticker_symbol, period)
+                    if tabs[1].open:
+                        with tabs[1]:
+                            _charts_fragment(ticker_symbol, period)
                     
-                    with tabs[2]:
-                        # Get technical indicators from sidebar inputs
-                        technical_indicators = {
-                            'ma_periods': sidebar_inputs.get('ma_periods', []),
-                            'show_rsi': sidebar_inputs.get('show_rsi', False),
-                            'show_macd': sidebar_inputs.get('show_macd', False),
-                            'show_bollinger': sidebar_inputs.get('show_bollinger', False),
-                            'show_volatility': sidebar_inputs.get('show_volatility', False),
-                            'show_drawdown': sidebar_inputs.get('show_drawdown', False)
-                        }
-                        show_technical_analysis(ticker_symbol, period, technical_indicators)
+                    if tabs[2].open:
+                        with tabs[2]:
+                            # Get technical indicators from sidebar inputs
+                            technical_indicators = {
+                                'ma_periods': sidebar_inputs.get('ma_periods', []),
+                                'show_rsi': sidebar_inputs.get('show_rsi', False),
+                                'show_macd': sidebar_inputs.get('show_macd', False),
+                                'show_bollinger': sidebar_inputs.get('show_bollinger', False),
+                                'show_volatility': sidebar_inputs.get('show_volatility', False),
+                                'show_drawdown': sidebar_inputs.get('show_drawdown', False)
+                            }
+                            _technical_fragment(ticker_symbol, period, technical_indicators)
                     
-                    with tabs[3]:
-                        show_financial_metrics(ticker_symbol, info)
+                    if tabs[3].open:
+                        with tabs[3]:
+                            _financials_fragment(ticker_symbol, info)
                     
-                    with tabs[4]:
-                        show_news_sentiment(ticker_symbol)
+                    if tabs[4].open:
+                        with tabs[4]:
+                            _news_fragment(ticker_symbol)
             else:
                 st.error(f"Unable to fetch data for {ticker_symbol}. Please try again later.")
         
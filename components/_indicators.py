@@ -0,0 +1,163 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the kernels run as plain Python loops
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def sma(close, windows):
+    """Simple moving averages for several window sizes in a single pass over the data.
+
+    Like rolling(window).mean(), a window containing a NaN yields NaN, and values
+    resume once the NaN has left the window.
+    """
+    size = close.shape[0]
+    count = windows.shape[0]
+    out = np.full((count, size), np.nan)
+    sums = np.zeros(count)
+    nans = np.zeros(count, dtype=np.int64)
+
+    for i in range(size):
+        value = close[i]
+        for j in range(count):
+            window = windows[j]
+            # Running sum of the valid values: add the new value and drop the one leaving the window
+            if np.isnan(value):
+                nans[j] += 1
+            else:
+                sums[j] += value
+            if i >= window:
+                old_value = close[i - window]
+                if np.isnan(old_value):
+                    nans[j] -= 1
+                else:
+                    sums[j] -= old_value
+            if i >= window - 1 and nans[j] == 0:
+                out[j, i] = sums[j] / window
+
+    return out
+
+
+@njit(cache=True)
+def rsi(close, n):
+    """Relative Strength Index using simple n-period averages of gains and losses."""
+    size = close.shape[0]
+    out = np.full(size, np.nan)
+
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(1, size):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain_sum += delta
+        elif delta < 0:
+            loss_sum -= delta
+
+        # Drop the delta that just left the window
+        if i > n:
+            old_delta = close[i - n] - close[i - n - 1]
+            if old_delta > 0:
+                gain_sum -= old_delta
+            elif old_delta < 0:
+                loss_sum += old_delta
+
+        if i >= n:
+            avg_gain = gain_sum / n
+            avg_loss = loss_sum / n
+            if avg_loss > 0:
+                out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            elif avg_gain > 0:
+                out[i] = 100.0
+
+    return out
+
+
+@njit(cache=True)
+def macd_columns(close, fast=12, slow=26, sig=9):
+    """MACD and signal lines for every column of a (bars, series) array in a single pass."""
+    rows, cols = close.shape
+    macd_line = np.empty((rows, cols))
+    signal_line = np.empty((rows, cols))
+    alpha_fast = 2.0 / (fast + 1.0)
+    alpha_slow = 2.0 / (slow + 1.0)
+    alpha_sig = 2.0 / (sig + 1.0)
+
+    # Running EMA state per column, seeded by the first valid value (ewm adjust=False semantics)
+    ema_fast = np.full(cols, np.nan)
+    ema_slow = np.full(cols, np.nan)
+    ema_sig = np.full(cols, np.nan)
+    for i in range(rows):
+        for j in range(cols):
+            value = close[i, j]
+            if np.isnan(ema_fast[j]):
+                ema_fast[j] = value
+                ema_slow[j] = value
+            elif not np.isnan(value):
+                ema_fast[j] += alpha_fast * (value - ema_fast[j])
+                ema_slow[j] += alpha_slow * (value - ema_slow[j])
+
+            line = ema_fast[j] - ema_slow[j]
+            if np.isnan(ema_sig[j]):
+                ema_sig[j] = line
+            elif not np.isnan(line):
+                ema_sig[j] += alpha_sig * (line - ema_sig[j])
+
+            macd_line[i, j] = line
+            signal_line[i, j] = ema_sig[j]
+
+    return macd_line, signal_line
+
+
+@njit(cache=True)
+def macd(close, fast=12, slow=26, sig=9):
+    """MACD line, signal line and histogram."""
+    macd_line, signal_line = macd_columns(close.reshape(close.shape[0], 1), fast, slow, sig)
+    macd_line = macd_line[:, 0]
+    signal_line = signal_line[:, 0]
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit(cache=True)
+def bollinger(close, n=20, k=2.0):
+    """Bollinger Bands (middle, upper, lower) using an n-period sample standard deviation.
+
+    A window containing a NaN yields NaN bands, matching rolling(n).mean()/std().
+    """
+    size = close.shape[0]
+    middle = np.full(size, np.nan)
+    upper = np.full(size, np.nan)
+    lower = np.full(size, np.nan)
+
+    total = 0.0
+    total_sq = 0.0
+    nans = 0
+    for i in range(size):
+        value = close[i]
+        if np.isnan(value):
+            nans += 1
+        else:
+            total += value
+            total_sq += value * value
+        if i >= n:
+            old_value = close[i - n]
+            if np.isnan(old_value):
+                nans -= 1
+            else:
+                total -= old_value
+                total_sq -= old_value * old_value
+
+        if i >= n - 1 and nans == 0:
+            mean = total / n
+            variance = max((total_sq - total * mean) / (n - 1), 0.0)
+            band = k * np.sqrt(variance)
+            middle[i] = mean
+            upper[i] = mean + band
+            lower[i] = mean - band
+
+    return middle, upper, lower
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+# The CUDA stack is only imported when explicitly enabled so CPU hosts never pay for it.
+# Each library is optional on its own: the indicators need cuDF and the correlations need CuPy.
+cudf = None
+cp = None
+if os.environ.get('FINANCE_TRACKER_GPU', '').lower() in ('1', 'true', 'yes'):
+    try:
+        import cudf
+    except ImportError:
+        cudf = None
+    try:
+        import cupy as cp
+    except ImportError:
+        cp = None
+
+# Histories shorter than this stay on the numba kernels; transfer costs dominate below it
+GPU_MIN_BARS = 50_000
+
+# Price matrices with fewer values than this (tickers x bars) stay on NumPy for correlations
+GPU_MIN_CORR_VALUES = 200_000
+
+
+def is_enabled(size, min_size=GPU_MIN_BARS):
+    """Whether indicators for an input of this size should be computed on the GPU with cuDF."""
+    return cudf is not None and size > min_size
+
+
+def is_corrcoef_enabled(size, min_size=GPU_MIN_CORR_VALUES):
+    """Whether a correlation matrix over this many prices should be computed on the GPU with CuPy."""
+    return cp is not None and size > min_size
+
+
+def _to_numpy(series):
+    """Copy a cuDF result back to the host with nulls as NaN."""
+    return series.to_pandas().to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def sma(close, windows):
+    """Simple moving averages for several window sizes, stacked as a (len(windows), n) array."""
+    series = cudf.Series(close)
+    return np.vstack([_to_numpy(series.rolling(int(window)).mean()) for window in windows])
+
+
+def rsi(close, n):
+    """Relative Strength Index using simple n-period averages of gains and losses."""
+    delta = cudf.Series(close).diff()
+    avg_gain = delta.clip(lower=0).rolling(n).mean()
+    avg_loss = (-delta).clip(lower=0).rolling(n).mean()
+    return _to_numpy(100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def macd(close, fast=12, slow=26, sig=9):
+    """MACD line, signal line and histogram."""
+    series = cudf.Series(close)
+    macd_line = series.ewm(span=fast, adjust=False).mean() - series.ewm(span=slow, adjust=False).mean()
+    signal_line = macd_line.ewm(span=sig, adjust=False).mean()
+    return _to_numpy(macd_line), _to_numpy(signal_line), _to_numpy(macd_line - signal_line)
+
+
+def log_return_corrcoef(prices):
+    """Correlation matrix of log returns for a (bars, tickers) price array."""
+    returns = cp.diff(cp.log(cp.asarray(prices, dtype=cp.float64)), axis=0)
+    return cp.asnumpy(cp.corrcoef(returns, rowvar=False))
+
+
+def bollinger(close, n=20, k=2.0):
+    """Bollinger Bands (middle, upper, lower) using an n-period sample standard deviation."""
+    rolling = cudf.Series(close).rolling(n)
+    middle = rolling.mean()
+    band = rolling.std() * k
+    return _to_numpy(middle), _to_numpy(middle + band), _to_numpy(middle - band)
@@ -1,8 +1,101 @@
 import streamlit as st
+import numpy as np
+from types import SimpleNamespace
+import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from .utils import get_stock_history
 
+# Maximum number of bars sent to the browser before the chart is resampled
+MAX_CHART_BARS = 2000
+
+# Candidate resampling rules and their nominal bar widths, finest first
+RESAMPLE_RULES = [
+    ('5min', pd.Timedelta(minutes=5)),
+    ('15min', pd.Timedelta(minutes=15)),
+    ('1h', pd.Timedelta(hours=1)),
+    ('1D', pd.Timedelta(days=1)),
+    ('W', pd.Timedelta(weeks=1)),
+    ('ME', pd.Timedelta(days=31)),
+]
+
+# Daily move (in percent) above which a bar is annotated, and how many moves to mark each way
+SIGNIFICANT_MOVE_PCT = 3
+MAX_HIGHLIGHTS = 5
+
+def resample_rule(df, max_bars=MAX_CHART_BARS):
+    """Finest resampling rule that brings df under max_bars, or None when it already fits."""
+    if len(df) <= max_bars:
+        return None
+    
+    target_width = (df.index[-1] - df.index[0]) / max_bars
+    return next((rule for rule, width in RESAMPLE_RULES if width >= target_width), RESAMPLE_RULES[-1][0])
+
+def downsample_ohlc(df, max_bars=MAX_CHART_BARS):
+    """Resample OHLCV data to a coarser timeframe when it has too many bars to render smoothly."""
+    rule = resample_rule(df, max_bars)
+    if rule is None:
+        return df
+    
+    return df.resample(rule).agg({
+        'Open': 'first',
+        'High': 'max',
+        'Low': 'min',
+        'Close': 'last',
+        'Volume': 'sum'
+    }).dropna()
+
+def _select_extreme_moves(returns, mask, k=MAX_HIGHLIGHTS, largest=True):
+    """Return the positions of the k most extreme returns within mask, using an O(N) partial sort."""
+    idx = np.flatnonzero(mask)
+    if len(idx) > k:
+        if largest:
+            idx = idx[np.argpartition(returns[idx], -k)[-k:]]
+        else:
+            idx = idx[np.argpartition(returns[idx], k)[:k]]
+    return idx
+
+def _containing_bar_positions(dates, daily_index, bar_index, rule):
+    """Positions in bar_index of the resampled bars that contain each of dates."""
+    # First daily timestamp of every plotted bar; a date belongs to the last bar starting at or before it
+    bar_starts = daily_index.to_series().resample(rule).first().reindex(bar_index)
+    return pd.DatetimeIndex(bar_starts).searchsorted(dates, side='right') - 1
+
+def _compute_bar_features(hist, daily=None, rule=None):
+    """Read the OHLCV columns once and derive every per-bar array the price chart needs.
+    
+    When hist was resampled from daily with rule, significant moves are still picked from the
+    daily closes and placed on the resampled bars that contain them.
+    """
+    open_ = hist['Open'].to_numpy()
+    close = hist['Close'].to_numpy()
+    daily_close = close if rule is None else daily['Close'].to_numpy()
+    
+    # Percentage change from the previous close; the first bar has no prior close
+    returns = np.full(len(daily_close), np.nan, dtype=daily_close.dtype)
+    returns[1:] = np.diff(daily_close) / daily_close[:-1] * 100
+    
+    up_idx = _select_extreme_moves(returns, returns > SIGNIFICANT_MOVE_PCT)
+    down_idx = _select_extreme_moves(returns, returns < -SIGNIFICANT_MOVE_PCT, largest=False)
+    if rule is None:
+        up_pos, down_pos = up_idx, down_idx
+    else:
+        up_pos = _containing_bar_positions(daily.index[up_idx], daily.index, hist.index, rule)
+        down_pos = _containing_bar_positions(daily.index[down_idx], daily.index, hist.index, rule)
+    
+    return SimpleNamespace(
+        open=open_,
+        high=hist['High'].to_numpy(),
+        low=hist['Low'].to_numpy(),
+        close=close,
+        volume=hist['Volume'].to_numpy(),
+        down_color_mask=open_ > close,
+        sig_up_idx=up_pos,
+        sig_up_returns=returns[up_idx],
+        sig_down_idx=down_pos,
+        sig_down_returns=returns[down_idx]
+    )
+
 def show_price_charts(ticker_symbol, period="1y"):
     # Get historical data with rate limiting
     df = get_stock_history(ticker_symbol, period)
@@ -11,6 +104,37 @@ def show_price_charts(ticker_symbol, period="1y"):
         st.error(f"Unable to fetch price data for {ticker_symbol}. Please try again later.")
         return
 
+    # Compute all metric reductions in a single pass
+    stats = df.agg({'High': 'max', 'Low': 'min', 'Volume': ['mean', 'max']})
+    recent_closes = df['Close'].to_numpy()[-2:]
+    current_price = recent_closes[-1]
+    price_change = current_price - recent_closes[0] if len(recent_closes) > 1 else 0
+    
+    # Display key price metrics
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("Current Price", f"${current_price:.2f}", f"{price_change:+.2f}")
+    
+    with col2:
+        st.metric("Period High", f"${stats.loc['max', 'High']:.2f}")
+    
+    with col3:
+        st.metric("Period Low", f"${stats.loc['min', 'Low']:.2f}")
+    
+    with col4:
+        st.metric("Avg Volume", f"{stats.loc['mean', 'Volume']:,.0f}")
+    
+    with col5:
+        st.metric("Max Volume", f"{stats.loc['max', 'Volume']:,.0f}")
+
+    # Resample long histories so the browser only renders a bounded number of bars
+    rule = resample_rule(df)
+    is_long_history = rule is not None
+    daily = df
+    df = downsample_ohlc(daily)
+    bars = _compute_bar_features(df, daily, rule)
+
     # Create figure with secondary y-axis
     fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
                        vertical_spacing=0.03, 
@@ -18,19 +142,33 @@ def show_price_charts(ticker_symbol, period="1y"):
 
     # Add candlestick chart
     fig.add_trace(go.Candlestick(x=df.index,
-                                open=df['Open'],
-                                high=df['High'],
-                                low=df['Low'],
-                                close=df['Close'],
+                                open=bars.open,
+                                high=bars.high,
+                                low=bars.low,
+                                close=bars.close,
                                 name='OHLC'),
                   row=1, col=1)
 
-    # Add volume bar chart
-    fig.add_trace(go.Bar(x=df.index, 
-                        y=df['Volume'],
-                        name='Volume',
-                        marker_color='rgba(0,0,255,0.3)'),
-                  row=2, col=1)
+    # Add volume chart, using a WebGL area trace for long histories
+    if is_long_history:
+        fig.add_trace(go.Scattergl(x=df.index,
+                                  y=bars.volume,
+                                  name='Volume',
+                                  mode='lines',
+                                  fill='tozeroy',
+                                  line=dict(color='rgba(30,136,229,0.8)')),
+                      row=2, col=1)
+    else:
+        # Color volume bars by the direction of the day's move
+        colors = np.where(bars.down_color_mask, 'red', 'green')
+        fig.add_trace(go.Bar(x=df.index, 
+                            y=bars.volume,
+                            name='Volume',
+                            marker_color=colors),
+                      row=2, col=1)
+
+    # Mark the largest daily moves on the price chart
+    highlight_significant_price_changes(fig, df, row=1, col=1, bars=bars)
 
     # Update layout
     fig.update_layout(
@@ -38,52 +176,60 @@ def show_price_charts(ticker_symbol, period="1y"):
         yaxis_title='Stock Price (USD)',
         yaxis2_title='Volume',
         xaxis_rangeslider_visible=False,
+        template='plotly_dark',
         height=800
     )
 
-    st.plotly_chart(fig, use_container_width=True)
-
-
-def highlight_significant_price_changes(fig, hist, row=1, col=1):
-    """Add annotations for significant price changes."""
-    
-    # Calculate daily returns
-    hist['Return'] = hist['Close'].pct_change() * 100
-    
-    # Identify significant movements (e.g., > +/-3%)
-    significant_up = hist[hist['Return'] > 3]
-    significant_down = hist[hist['Return'] < -3]
-    
-    # Limit to 5 most significant up and down movements to avoid cluttering
-    significant_up = significant_up.nlargest(5, 'Return')
-    significant_down = significant_down.nsmallest(5, 'Return')
-    
-    # Add annotations for significant up movements
-    for date, row_data in significant_up.iterrows():
-        fig.add_annotation(
-            x=date,
-            y=row_data['High'] * 1.02,  # Place annotation slightly above high price
-            text=f"+{row_data['Return']:.1f}%",
-            showarrow=True,
-            arrowhead=1,
-            arrowsize=0.5,
-            arrowwidth=1,
-            arrowcolor="green",
-            font=dict(color="green", size=10),
-            row=row, col=col
-        )
-    
-    # Add annotations for significant down movements
-    for date, row_data in significant_down.iterrows():
-        fig.add_annotation(
-            x=date,
-            y=row_data['Low'] * 0.98,  # Place annotation slightly below low price
-            text=f"{row_data['Return']:.1f}%",
-            showarrow=True,
-            arrowhead=1,
-            arrowsize=0.5,
-            arrowwidth=1,
-            arrowcolor="red",
-            font=dict(color="red", size=10),
-            row=row, col=col
-        ) 
\ No newline at end of file
+    st.plotly_chart(fig, use_container_width=True, config={'scrollZoom': True}, key='price_chart')
+
+
+def highlight_significant_price_changes(fig, hist: pd.DataFrame, row=1, col=1, bars=None):
+    """Add annotations for significant price changes.
+    
+    hist may be the shared st.cache_data result and is treated as read-only;
+    returns are computed into a local array rather than a new column.
+    """
+    
+    # Reuse the chart's bar features when available instead of rescanning the columns
+    if bars is None:
+        bars = _compute_bar_features(hist)
+    
+    # Resolve the axis references for the target subplot once
+    subplot = fig.get_subplot(row, col)
+    xref = subplot.xaxis.plotly_name.replace('axis', '')
+    yref = subplot.yaxis.plotly_name.replace('axis', '')
+    
+    def build_annotations(dates, prices, returns, color, text_format):
+        return [
+            dict(
+                x=date,
+                y=price,
+                xref=xref,
+                yref=yref,
+                text=text_format.format(ret),
+                showarrow=True,
+                arrowhead=1,
+                arrowsize=0.5,
+                arrowwidth=1,
+                arrowcolor=color,
+                font=dict(color=color, size=10)
+            )
+            for date, price, ret in zip(dates, prices, returns)
+        ]
+    
+    # Place up annotations slightly above the high and down annotations slightly below the low
+    annotations_up = build_annotations(
+        hist.index[bars.sig_up_idx],
+        bars.high[bars.sig_up_idx] * 1.02,
+        bars.sig_up_returns,
+        "green", "+{:.1f}%"
+    )
+    annotations_down = build_annotations(
+        hist.index[bars.sig_down_idx],
+        bars.low[bars.sig_down_idx] * 0.98,
+        bars.sig_down_returns,
+        "red", "{:.1f}%"
+    )
+    
+    # Add all annotations in a single layout update
+    fig.update_layout(annotations=list(fig.layout.annotations) + annotations_up + annotations_down)
@@ -1,37 +1,68 @@
 import streamlit as st
-import yfinance as yf
+import re
+from .utils import get_batch_history, get_stock_info, script_thread_pool
+from . import _indicators, _indicators_gpu
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+# Maximum number of points sent to the browser for each comparison line trace
+LTTB_POINTS = 800
+
+# Longest history the technical comparison computes indicators on before resampling to coarser bars
+MAX_INDICATOR_BARS = 2000
+
+# Shape of a Yahoo Finance symbol, e.g. AAPL, BRK-B, 7203.T, ^GSPC, EURUSD=X
+TICKER_PATTERN = re.compile(r'^\^?[A-Z0-9][A-Z0-9.\-=]{0,14}$')
+
 def show_stock_comparison():
     """Display stock comparison analysis."""
     
     st.header('Stock Comparison')
     
-    # Create columns for input
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        # Get user input for stocks to compare
-        st.write("Enter stock tickers separated by commas (e.g., AAPL, MSFT, GOOGL)")
-        tickers_input = st.text_input('Stock Tickers', 'AAPL, MSFT, GOOGL')
-    
-    with col2:
-        # Get time period for comparison
-        period = st.selectbox(
-            'Select Time Period',
-            ['1mo', '3mo', '6mo', '1y', '2y', '5y', 'max'],
-            index=3
-        )
+    # Group the inputs in a form so data is only fetched on submit, not on every keystroke
+    with st.form('comparison_inputs'):
+        # Create columns for input
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            # Get user input for stocks to compare
+            st.write("Enter stock tickers separated by commas (e.g., AAPL, MSFT, GOOGL)")
+            tickers_input = st.text_input('Stock Tickers', 'AAPL, MSFT, GOOGL')
+        
+        with col2:
+            # Get time period for comparison
+            period = st.selectbox(
+                'Select Time Period',
+                ['1mo', '3mo', '6mo', '1y', '2y', '5y', 'max'],
+                index=3
+            )
+        
+        st.form_submit_button('Compare')
     
     if tickers_input:
-        # Parse and clean tickers
-        tickers = [ticker.strip().upper() for ticker in tickers_input.split(',')]
+        # Parse and clean tickers, dropping blanks and duplicates
+        tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()))
+        
+        # Reject malformed symbols before they cost a network round-trip
+        invalid = [ticker for ticker in tickers if not TICKER_PATTERN.match(ticker)]
+        if invalid:
+            st.warning(f"Ignoring invalid ticker symbols: {', '.join(invalid)}")
+            tickers = [ticker for ticker in tickers if ticker not in invalid]
         
         # Show loading message
         with st.spinner('Fetching data for comparison...'):
+            # Fetch once and share the cached data across all comparison tabs. The batched
+            # history download and the per-ticker info requests run concurrently so the
+            # tabs wait on the slowest fetch rather than the sum of them.
+            with script_thread_pool(len(tickers) + 1) as executor:
+                history_future = executor.submit(get_batch_history, tickers, period)
+                infos = dict(zip(tickers, executor.map(get_stock_info, tickers)))
+                histories = history_future.result()
+            
+            warn_missing_tickers(tickers, histories)
+            
             # Create tabs for different comparisons
             comp_tabs = st.tabs([
                 '📈 Price Performance',
@@ -41,16 +72,16 @@ def show_stock_comparison():
             ])
             
             with comp_tabs[0]:
-                show_price_comparison(tickers, period)
+                show_price_comparison(histories)
             
             with comp_tabs[1]:
-                show_financial_comparison(tickers)
+                show_financial_comparison(infos)
             
             with comp_tabs[2]:
-                show_technical_comparison(tickers, period)
+                show_technical_comparison(histories)
             
             with comp_tabs[3]:
-                show_correlation_analysis(tickers, period)
+                show_correlation_analysis(histories)
     else:
         # Show instructions if no tickers entered
         st.info("""
@@ -67,55 +98,41 @@ def show_stock_comparison():
         - **Correlation**: Analyze how the stocks move in relation to each other
         """)
 
-def show_price_comparison(tickers, period):
-    """Display price performance comparison."""
+def show_price_comparison(data):
+    """Display price performance comparison for a {ticker: history} mapping."""
     
     st.subheader('Price Performance Comparison')
     
     try:
-        # Get historical data for all tickers
-        data = {}
-        normalized_data = {}
-        start_prices = {}
-        
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period)
-                if not hist.empty:
-                    data[ticker] = hist
-                    # Normalize prices to compare percentage changes
-                    start_price = hist['Close'].iloc[0]
-                    start_prices[ticker] = start_price
-                    normalized_data[ticker] = (hist['Close'] / start_price - 1) * 100
-            except Exception as e:
-                st.warning(f"Could not fetch data for {ticker}: {e}")
-        
         if data:
             # Display summary statistics first
             st.write("**Performance Summary**")
             
-            summary_data = []
-            for ticker in data.keys():
-                hist = data[ticker]
-                current_price = hist['Close'].iloc[-1]
-                start_price = hist['Close'].iloc[0]
-                change_pct = ((current_price - start_price) / start_price) * 100
-                high = hist['High'].max()
-                low = hist['Low'].min()
-                
-                summary_data.append({
-                    'Ticker': ticker,
-                    'Current Price': f"${current_price:.2f}",
-                    'Change (%)': f"{change_pct:.1f}%",
-                    'Period High': f"${high:.2f}",
-                    'Period Low': f"${low:.2f}",
-                    'Volume (Avg)': f"{hist['Volume'].mean():,.0f}"
-                })
-            
-            summary_df = pd.DataFrame(summary_data)
+            # Stack each column into a wide frame and reduce all tickers at once
+            closes = stack_column(data, 'Close')
+            first = closes.bfill().iloc[0]
+            last = closes.ffill().iloc[-1]
+            
+            # Normalize prices to compare percentage changes in one broadcast
+            normalized = (closes / first - 1.0) * 100.0
+            
+            summary_df = pd.DataFrame({
+                'Current Price': last,
+                'Change (%)': (last / first - 1) * 100,
+                'Period High': stack_column(data, 'High').max(),
+                'Period Low': stack_column(data, 'Low').min(),
+                'Volume (Avg)': stack_column(data, 'Volume').mean()
+            })
+            summary_df.index.name = 'Ticker'
+            
             st.dataframe(
-                summary_df.set_index('Ticker'),
+                summary_df.style.format({
+                    'Current Price': '${:.2f}',
+                    'Change (%)': '{:.1f}%',
+                    'Period High': '${:.2f}',
+                    'Period Low': '${:.2f}',
+                    'Volume (Avg)': '{:,.0f}'
+                }),
                 use_container_width=True,
                 hide_index=False
             )
@@ -127,10 +144,11 @@ def show_price_comparison(tickers, period):
                 # Absolute price chart
                 fig = go.Figure()
                 for ticker in data.keys():
+                    prices = downsample_series(data[ticker]['Close'])
                     fig.add_trace(
-                        go.Scatter(
-                            x=data[ticker].index,
-                            y=data[ticker]['Close'],
+                        go.Scattergl(
+                            x=prices.index,
+                            y=prices,
                             name=f"{ticker} (${data[ticker]['Close'].iloc[-1]:.2f})",
                             mode='lines'
                         )
@@ -149,9 +167,10 @@ def show_price_comparison(tickers, period):
             with col2:
                 # Normalized comparison chart
                 fig_norm = go.Figure()
-                for ticker, norm_prices in normalized_data.items():
+                for ticker in normalized.columns:
+                    norm_prices = downsample_series(normalized[ticker])
                     fig_norm.add_trace(
-                        go.Scatter(
+                        go.Scattergl(
                             x=norm_prices.index,
                             y=norm_prices,
                             name=f"{ticker} ({norm_prices.iloc[-1]:.1f}%)",
@@ -201,8 +220,8 @@ def show_price_comparison(tickers, period):
         st.error(f"Error in price comparison: {e}")
 
 
-def show_financial_comparison(tickers):
-    """Display financial metrics comparison."""
+def show_financial_comparison(infos):
+    """Display financial metrics comparison for a {ticker: info} mapping."""
     
     st.subheader('Financial Metrics Comparison')
     
@@ -210,10 +229,10 @@ def show_financial_comparison(tickers):
         # Get financial data for all tickers
         financial_data = []
         
-        for ticker in tickers:
+        for ticker, info in infos.items():
             try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
+                if not info:
+                    raise ValueError("no company info returned")
                 
                 metrics = {
                     'Ticker': ticker,
@@ -240,27 +259,22 @@ def show_financial_comparison(tickers):
             df = pd.DataFrame(financial_data)
             df = df.set_index('Ticker')
             
-            # Format the data
+            # Format the data with vectorized Styler formatters
             format_dict = {
-                'Market Cap': lambda x: f"${x:,.0f}" if pd.notnull(x) else 'N/A',
-                'P/E Ratio': lambda x: f"{x:.2f}" if pd.notnull(x) else 'N/A',
-                'Forward P/E': lambda x: f"{x:.2f}" if pd.notnull(x) else 'N/A',
-                'PEG Ratio': lambda x: f"{x:.2f}" if pd.notnull(x) else 'N/A',
-                'Price/Book': lambda x: f"{x:.2f}" if pd.notnull(x) else 'N/A',
-                'Profit Margin': lambda x: f"{x:.2%}" if pd.notnull(x) else 'N/A',
-                'Operating Margin': lambda x: f"{x:.2%}" if pd.notnull(x) else 'N/A',
-                'ROE': lambda x: f"{x:.2%}" if pd.notnull(x) else 'N/A',
-                'ROA': lambda x: f"{x:.2%}" if pd.notnull(x) else 'N/A',
-                'Revenue Growth': lambda x: f"{x:.2%}" if pd.notnull(x) else 'N/A',
-                'Dividend Yield': lambda x: f"{x:.2%}" if pd.notnull(x) else 'N/A'
+                'Market Cap': '${:,.0f}',
+                'P/E Ratio': '{:.2f}',
+                'Forward P/E': '{:.2f}',
+                'PEG Ratio': '{:.2f}',
+                'Price/Book': '{:.2f}',
+                'Profit Margin': '{:.2%}',
+                'Operating Margin': '{:.2%}',
+                'ROE': '{:.2%}',
+                'ROA': '{:.2%}',
+                'Revenue Growth': '{:.2%}',
+                'Dividend Yield': '{:.2%}'
             }
             
-            formatted_df = df.copy()
-            for col, format_func in format_dict.items():
-                if col in formatted_df.columns:
-                    formatted_df[col] = formatted_df[col].apply(format_func)
-            
-            st.dataframe(formatted_df)
+            st.dataframe(df.style.format(format_dict, na_rep='N/A'))
             
             # Create visualizations for key metrics
             numeric_df = df.copy()
@@ -355,37 +369,47 @@ def show_financial_comparison(tickers):
         st.error(f"Error in financial comparison: {e}")
 
 
-def show_technical_comparison(tickers, period):
-    """Display technical indicators comparison."""
+def show_technical_comparison(histories):
+    """Display technical indicators comparison for a {ticker: history} mapping."""
     
     st.subheader('Technical Indicators Comparison')
     
     try:
-        # Get data and calculate technical indicators for all tickers
+        # Calculate technical indicators for all tickers at once on a wide frame of closes.
+        # Gaps from differing exchange calendars are forward-filled so rolling windows stay intact.
         tech_data = {}
         
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period)
-                
-                if not hist.empty:
-                    # Calculate technical indicators
-                    hist['MA20'] = hist['Close'].rolling(window=20).mean()
-                    hist['MA50'] = hist['Close'].rolling(window=50).mean()
-                    hist['RSI'] = calculate_rsi(hist['Close'])
-                    hist['MACD'], hist['Signal'] = calculate_macd(hist['Close'])
-                    
-                    tech_data[ticker] = hist
+        if histories:
+            closes = stack_column(histories, 'Close').ffill()
+            
+            # Resample very long histories so indicators and charts work on a bounded bar count
+            resample_rule = None
+            if len(closes) > MAX_INDICATOR_BARS:
+                resample_rule = '1W' if len(closes) > 5000 else '2D'
+                closes = closes.resample(resample_rule).last().dropna(how='all')
+                st.caption(f"Long history: indicators are computed on {'weekly' if resample_rule == '1W' else '2-day'} bars.")
+            
+            indicators = {
+                'Close': closes,
+                'MA20': closes.rolling(window=20).mean(),
+                'MA50': closes.rolling(window=50).mean(),
+                'RSI': calculate_rsi(closes)
+            }
+            indicators['MACD'], indicators['Signal'] = calculate_macd(closes)
             
-            except Exception as e:
-                st.warning(f"Could not calculate technical indicators for {ticker}: {e}")
+            # Slice each ticker's columns back onto its own trading days (or its own resampled bars)
+            for ticker, hist in histories.items():
+                data = pd.DataFrame({name: frame[ticker] for name, frame in indicators.items()})
+                tech_data[ticker] = data.dropna(subset=['Close']) if resample_rule else data.loc[hist.index]
         
         if tech_data:
             # Create technical analysis visualizations
             for ticker, data in tech_data.items():
                 st.write(f"**Technical Analysis - {ticker}**")
                 
+                # Thin long series before plotting; the full frame is kept for the signals below
+                plot_data = {column: downsample_series(data[column]) for column in data.columns}
+                
                 # Create subplots for price with MA and indicators
                 fig = make_subplots(
                     rows=3, cols=1,
@@ -397,9 +421,9 @@ def show_technical_comparison(tickers, period):
                 
                 # Price and MA
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data['Close'],
+                    go.Scattergl(
+                        x=plot_data['Close'].index,
+                        y=plot_data['Close'],
                         name='Price',
                         line=dict(color='white')
                     ),
@@ -407,9 +431,9 @@ def show_technical_comparison(tickers, period):
                 )
                 
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data['MA20'],
+                    go.Scattergl(
+                        x=plot_data['MA20'].index,
+                        y=plot_data['MA20'],
                         name='MA20',
                         line=dict(color='orange')
                     ),
@@ -417,9 +441,9 @@ def show_technical_comparison(tickers, period):
                 )
                 
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data['MA50'],
+                    go.Scattergl(
+                        x=plot_data['MA50'].index,
+                        y=plot_data['MA50'],
                         name='MA50',
                         line=dict(color='blue')
                     ),
@@ -428,9 +452,9 @@ def show_technical_comparison(tickers, period):
                 
                 # RSI
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data['RSI'],
+                    go.Scattergl(
+                        x=plot_data['RSI'].index,
+                        y=plot_data['RSI'],
                         name='RSI',
                         line=dict(color='purple')
                     ),
@@ -443,9 +467,9 @@ def show_technical_comparison(tickers, period):
                 
                 # MACD
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data['MACD'],
+                    go.Scattergl(
+                        x=plot_data['MACD'].index,
+                        y=plot_data['MACD'],
                         name='MACD',
                         line=dict(color='blue')
                     ),
@@ -453,9 +477,9 @@ def show_technical_comparison(tickers, period):
                 )
                 
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data['Signal'],
+                    go.Scattergl(
+                        x=plot_data['Signal'].index,
+                        y=plot_data['Signal'],
                         name='Signal',
                         line=dict(color='orange')
                     ),
@@ -518,33 +542,29 @@ def show_technical_comparison(tickers, period):
         st.error(f"Error in technical comparison: {e}")
 
 
-def show_correlation_analysis(tickers, period):
-    """Display correlation analysis between stocks."""
+def show_correlation_analysis(histories):
+    """Display correlation analysis between stocks for a {ticker: history} mapping."""
     
     st.subheader('Correlation Analysis')
     
     try:
-        # Get closing prices for all tickers
-        prices_data = {}
-        
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period)
-                if not hist.empty:
-                    prices_data[ticker] = hist['Close']
-            except Exception as e:
-                st.warning(f"Could not fetch data for {ticker}: {e}")
-        
-        if prices_data:
-            # Create DataFrame with all closing prices
-            df = pd.DataFrame(prices_data)
-            
-            # Calculate returns
-            returns = df.pct_change()
-            
-            # Calculate correlation matrix
-            correlation = returns.corr()
+        if histories:
+            # Stack the shared closing prices, keeping only dates every ticker traded
+            df = stack_column(histories, 'Close').dropna(axis=1, how='all').dropna()
+            
+            # Calculate the correlation matrix of log returns in a single covariance call,
+            # on the GPU when enabled and the price matrix is large enough to pay for the transfer
+            prices = df.to_numpy(dtype=np.float64)
+            if _indicators_gpu.is_corrcoef_enabled(prices.size):
+                matrix = _indicators_gpu.log_return_corrcoef(prices)
+            else:
+                matrix = np.corrcoef(np.diff(np.log(prices), axis=0), rowvar=False)
+            
+            correlation = pd.DataFrame(
+                np.atleast_2d(matrix),
+                index=df.columns,
+                columns=df.columns
+            )
             
             # Create correlation heatmap
             fig = go.Figure(data=go.Heatmap(
@@ -576,32 +596,27 @@ def show_correlation_analysis(tickers, period):
             - Correlation near 0: No correlation
             """)
             
-            # Find highest and lowest correlations
-            correlations = []
-            for i in range(len(correlation.columns)):
-                for j in range(i+1, len(correlation.columns)):
-                    correlations.append({
-                        'Stock 1': correlation.columns[i],
-                        'Stock 2': correlation.columns[j],
-                        'Correlation': correlation.iloc[i, j]
-                    })
-            
-            if correlations:
-                corr_df = pd.DataFrame(correlations)
+            # Find highest and lowest correlations from the upper triangle, skipping the diagonal
+            rows, cols = np.triu_indices(len(correlation.columns), k=1)
+            pair_values = correlation.to_numpy()[rows, cols]
+            labels = correlation.columns.to_numpy()
+            
+            if len(pair_values):
+                count = min(3, len(pair_values))
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     st.write("**Highest Correlations**")
-                    highest_corr = corr_df.nlargest(3, 'Correlation')
-                    for _, row in highest_corr.iterrows():
-                        st.write(f"{row['Stock 1']} - {row['Stock 2']}: {row['Correlation']:.2f}")
+                    highest = np.argpartition(-pair_values, count - 1)[:count]
+                    for k in highest[np.argsort(-pair_values[highest])]:
+                        st.write(f"{labels[rows[k]]} - {labels[cols[k]]}: {pair_values[k]:.2f}")
                 
                 with col2:
                     st.write("**Lowest Correlations**")
-                    lowest_corr = corr_df.nsmallest(3, 'Correlation')
-                    for _, row in lowest_corr.iterrows():
-                        st.write(f"{row['Stock 1']} - {row['Stock 2']}: {row['Correlation']:.2f}")
+                    lowest = np.argpartition(pair_values, count - 1)[:count]
+                    for k in lowest[np.argsort(pair_values[lowest])]:
+                        st.write(f"{labels[rows[k]]} - {labels[cols[k]]}: {pair_values[k]:.2f}")
         
         else:
             st.write("No data available for correlation analysis")
@@ -612,22 +627,77 @@ def show_correlation_analysis(tickers, period):
 
 # Helper functions
 
+def lttb(x, y, n_out=LTTB_POINTS):
+    """Largest-Triangle-Three-Buckets: positions of n_out points that preserve the shape of a line."""
+    size = len(y)
+    if n_out >= size or n_out < 3:
+        return np.arange(size)
+    
+    # The first and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, size - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # The average of the next bucket (the last point for the final bucket) is the third vertex
+        next_end = edges[i + 2] if i + 2 < len(edges) else size
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # Keep the point forming the largest triangle with the previous pick and that average
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    
+    return selected
+
+
+def downsample_series(series, n_out=LTTB_POINTS):
+    """Drop NaNs and thin a time series to at most n_out points with LTTB."""
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+    
+    x = series.index.asi8.astype(np.float64)
+    return series.iloc[lttb(x, series.to_numpy(dtype=np.float64), n_out)]
+
+
+def stack_column(histories, column):
+    """Combine one column from each ticker's history into a wide frame with a column per ticker."""
+    return pd.concat({ticker: hist[column] for ticker, hist in histories.items()}, axis=1)
+
+
+def warn_missing_tickers(tickers, histories):
+    """Warn about tickers the batched download returned no data for."""
+    for ticker in tickers:
+        if ticker not in histories:
+            st.warning(f"Could not fetch data for {ticker}")
+
+
 def calculate_rsi(prices, periods=14):
-    """Calculate Relative Strength Index."""
+    """Calculate Relative Strength Index using Wilder's smoothing."""
     
     delta = prices.diff()
-    gain = (delta.clip(lower=0)).rolling(window=periods).mean()
-    loss = (-delta.clip(upper=0)).rolling(window=periods).mean()
+    gain = (delta.clip(lower=0)).ewm(alpha=1 / periods, adjust=False, min_periods=periods).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / periods, adjust=False, min_periods=periods).mean()
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
 
 def calculate_macd(prices, fast=12, slow=26, signal=9):
-    """Calculate MACD and Signal line."""
+    """Calculate MACD and Signal line for a price Series or a frame with one column per ticker."""
     
-    exp1 = prices.ewm(span=fast, adjust=False).mean()
-    exp2 = prices.ewm(span=slow, adjust=False).mean()
-    macd = exp1 - exp2
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
+    values = prices.to_numpy(dtype=np.float64).reshape(len(prices), -1)
+    macd, signal_line = _indicators.macd_columns(values, fast, slow, signal)
     
-    return macd, signal_line 
\ No newline at end of file
+    if isinstance(prices, pd.DataFrame):
+        return (pd.DataFrame(macd, index=prices.index, columns=prices.columns),
+                pd.DataFrame(signal_line, index=prices.index, columns=prices.columns))
+    return pd.Series(macd[:, 0], index=prices.index), pd.Series(signal_line[:, 0], index=prices.index) 
\ No newline at end of file
@@ -1,13 +1,27 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+from functools import lru_cache
+from ._indicators import njit
 from .utils import get_stock_financials
 
+# Suffix for each scale tag returned by _scale_and_tag
+_SCALE_SUFFIXES = np.array(['', 'M', 'B'])
+
 def format_currency(value):
     """Format large numbers in billions/millions"""
     if value is None or pd.isna(value):
         return "N/A"
     
+    # Normalize numpy scalars so equal values share one cache entry; the sign flag keeps
+    # -0.0 from reusing the entry for 0.0, since the two compare equal
+    value = float(value)
+    return _format_currency_cached(value, np.signbit(value))
+
+@lru_cache(maxsize=4096)
+def _format_currency_cached(value, negative):
+    """Format a finite float in billions/millions; memoized since many values repeat"""
     billion = 1_000_000_000
     million = 1_000_000
     
@@ -18,6 +32,57 @@ def format_currency(value):
     else:
         return f"${value:,.2f}"
 
+def _group_thousands(dollars):
+    """Format non-negative whole-dollar amounts below $10M with thousands separators"""
+    millions = dollars // 1_000_000
+    thousands = (dollars // 1_000) % 1_000
+    units = dollars % 1_000
+    
+    with_millions = np.char.add(np.char.add(np.char.mod('%d,', millions), np.char.mod('%03d,', thousands)), np.char.mod('%03d', units))
+    with_thousands = np.char.add(np.char.mod('%d,', thousands), np.char.mod('%03d', units))
+    return np.where(millions > 0, with_millions, np.where(thousands > 0, with_thousands, np.char.mod('%d', units)))
+
+@njit(cache=True)
+def _scale_and_tag(values):
+    """Scale a flat array into billions/millions, tagging each value 0 (unscaled), 1 (M) or 2 (B)"""
+    size = values.shape[0]
+    scaled = np.empty(size)
+    tags = np.zeros(size, dtype=np.int64)
+    
+    for i in range(size):
+        value = values[i]
+        magnitude = abs(value)
+        if magnitude >= 1_000_000_000:
+            scaled[i] = value / 1_000_000_000
+            tags[i] = 2
+        elif magnitude >= 1_000_000:
+            scaled[i] = value / 1_000_000
+            tags[i] = 1
+        else:
+            scaled[i] = value
+    
+    return scaled, tags
+
+def format_currency_array(values):
+    """Vectorized format_currency: format an array of numbers in billions/millions"""
+    arr = np.asarray(values, dtype=np.float64)
+    scaled, tags = _scale_and_tag(np.ascontiguousarray(arr).ravel())
+    scaled = scaled.reshape(arr.shape)
+    tags = tags.reshape(arr.shape)
+    is_small = tags == 0
+    
+    # Billions and millions: two decimals and a suffix
+    scaled_text = np.char.add(np.char.add('$', np.char.mod('%.2f', scaled)), _SCALE_SUFFIXES[tags])
+    
+    # Smaller amounts keep thousands separators; '%.2f' rounds exactly like format_currency's
+    # '{:,.2f}', so the separators are added to its whole-dollar part
+    parts = np.char.partition(np.char.mod('%.2f', np.where(is_small & ~np.isnan(arr), np.abs(arr), 0.0)), '.')
+    dollars = parts[..., 0].astype(np.int64)
+    sign = np.where(np.signbit(arr), '$-', '$')
+    small_text = np.char.add(np.char.add(sign, _group_thousands(dollars)), np.char.add('.', parts[..., 2]))
+    
+    return np.where(np.isnan(arr), 'N/A', np.where(is_small, small_text, scaled_text))
+
 def format_financial_statement(df):
     """Format financial statement dataframe and handle date parsing"""
     if df is None or df.empty:
@@ -27,8 +92,12 @@ def format_financial_statement(df):
         # Convert index to string to avoid any potential parsing issues
         df.index = df.index.astype(str)
         
-        # Ensure all data is numeric
-        df = df.apply(pd.to_numeric, errors='coerce')
+        # Ensure all data is numeric, with a direct cast when the columns already are
+        if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+            df = df.astype('float64', copy=False)
+        else:
+            values = pd.to_numeric(df.to_numpy(dtype=object).ravel(), errors='coerce')
+            df = pd.DataFrame(values.reshape(df.shape), index=df.index, columns=df.columns)
         
         # Sort columns in descending order (most recent first)
         df = df.sort_index(axis=1, ascending=False)
@@ -38,37 +107,94 @@ def format_financial_statement(df):
         st.error(f"Error formatting financial statement: {str(e)}")
         return None
 
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour, matching get_stock_financials
+def format_financial_statements(ticker_symbol, _financial_data):
+    """Format a ticker's income statement, balance sheet and cash flow once per cache period"""
+    return tuple(format_financial_statement(df) for df in _financial_data)
+
+# Balance sheet metrics mapped to the line-item names they appear under, in order of preference
+BALANCE_SHEET_CANDIDATES = {
+    'Total Assets': ['Total Assets', 'TotalAssets'],
+    'Total Current Assets': ['Total Current Assets', 'Current Assets'],
+    'Total Liabilities Net Minority Interest': ['Total Liabilities Net Minority Interest', 'Total Liab', 'Total Liabilities'],
+    'Total Current Liabilities': ['Total Current Liabilities', 'Current Liabilities'],
+    'Total Equity': ['Total Equity', 'Stockholders Equity', 'Total Equity Gross Minority Interest'],
+}
+
+def resolve_statement_rows(df, candidates):
+    """Select one row per metric, taking the first available candidate line item for each period"""
+    names = [name for aliases in candidates.values() for name in aliases]
+    metrics = [metric for metric, aliases in candidates.items() for _ in aliases]
+    
+    # One reindex for every candidate, then coalesce the aliases of each metric
+    present = df.reindex(names)
+    present.index = metrics
+    return present.groupby(level=0, sort=False).first().dropna(how='all')
+
+def money_column_config(df):
+    """Column config that shows every statement column as dollars, formatted by the frontend"""
+    return {str(column): st.column_config.NumberColumn(format="dollar") for column in df.columns}
+
 def create_financial_chart(df, title, metrics):
     """Create a financial chart with the specified metrics"""
     if df is None or df.empty:
         return None
         
-    fig = go.Figure()
-    
-    for metric in metrics:
-        if metric in df.index:
-            values = df.loc[metric]
-            fig.add_trace(go.Bar(
-                name=metric,
-                x=values.index,
-                y=values.values,
-                text=[format_currency(x) for x in values.values],
-                textposition='auto',
-            ))
-    
-    fig.update_layout(
-        title=title,
-        xaxis_title="Date",
-        yaxis_title="Amount ($)",
-        barmode='group',
-        template="plotly_dark",
-        showlegend=True,
-        height=600,
-        hovermode='x unified'
+    # One lookup for every metric present, skipping rows with no reported values
+    block = df.loc[[metric for metric in metrics if metric in df.index]].dropna(how='all')
+    if block.empty:
+        return None
+    
+    # The dates and labels are shared across traces, and the figure is built in one constructor
+    x = block.columns.to_numpy()
+    values = block.to_numpy(dtype=np.float64)
+    labels = format_currency_array(values)
+    
+    fig = go.Figure(
+        data=[
+            go.Bar(name=metric, x=x, y=y, text=text, textposition='auto')
+            for metric, y, text in zip(block.index, values, labels)
+        ],
+        layout=dict(
+            title=title,
+            xaxis_title="Date",
+            yaxis_title="Amount ($)",
+            barmode='group',
+            template="plotly_dark",
+            showlegend=True,
+            height=600,
+            hovermode='x unified'
+        )
     )
     
     return fig
 
+# Key metrics shown per column as (label, info key, formatter)
+KEY_METRIC_SPEC = [
+    [
+        ("Market Cap", 'marketCap', format_currency),
+        ("Revenue (TTM)", 'totalRevenue', format_currency),
+        ("Gross Profit (TTM)", 'grossProfits', format_currency),
+    ],
+    [
+        ("P/E Ratio", 'trailingPE', "{:.2f}".format),
+        ("Forward P/E", 'forwardPE', "{:.2f}".format),
+        ("PEG Ratio", 'pegRatio', "{:.2f}".format),
+    ],
+    [
+        ("Profit Margin", 'profitMargins', "{:.2%}".format),
+        ("Operating Margin", 'operatingMargins', "{:.2%}".format),
+        ("Dividend Yield", 'dividendYield', "{:.2%}".format),
+    ],
+]
+
+def format_key_metric(info, key, formatter):
+    """Format one info value, with a single lookup; ratios and margins show N/A when missing or zero"""
+    value = info.get(key)
+    if formatter is format_currency:
+        return format_currency(value)
+    return formatter(value) if value else "N/A"
+
 def show_financial_metrics(ticker_symbol, info=None):
     """Display financial metrics for a given stock"""
     st.header("Financial Analysis")
@@ -80,100 +206,85 @@ def show_financial_metrics(ticker_symbol, info=None):
         st.error("Unable to fetch financial data. Please try again later.")
         return
         
-    income_stmt, balance_sheet, cash_flow = financial_data
-    
-    # Format financial statements
-    income_stmt = format_financial_statement(income_stmt)
-    balance_sheet = format_financial_statement(balance_sheet)
-    cash_flow = format_financial_statement(cash_flow)
-    
-    # Create tabs for different financial statements
-    fin_tabs = st.tabs(["📊 Key Metrics", "💰 Income Statement", "📑 Balance Sheet", "💵 Cash Flow"])
-    
-    with fin_tabs[0]:
-        if info:
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("Market Cap", format_currency(info.get('marketCap')))
-                st.metric("Revenue (TTM)", format_currency(info.get('totalRevenue')))
-                st.metric("Gross Profit (TTM)", format_currency(info.get('grossProfits')))
-            
-            with col2:
-                st.metric("P/E Ratio", f"{info.get('trailingPE', 'N/A'):.2f}" if info.get('trailingPE') else "N/A")
-                st.metric("Forward P/E", f"{info.get('forwardPE', 'N/A'):.2f}" if info.get('forwardPE') else "N/A")
-                st.metric("PEG Ratio", f"{info.get('pegRatio', 'N/A'):.2f}" if info.get('pegRatio') else "N/A")
-            
-            with col3:
-                st.metric("Profit Margin", f"{info.get('profitMargins', 0)*100:.2f}%" if info.get('profitMargins') else "N/A")
-                st.metric("Operating Margin", f"{info.get('operatingMargins', 0)*100:.2f}%" if info.get('operatingMargins') else "N/A")
-                st.metric("Dividend Yield", f"{info.get('dividendYield', 0)*100:.2f}%" if info.get('dividendYield') else "N/A")
-    
-    with fin_tabs[1]:
-        if income_stmt is not None and not income_stmt.empty:
-            st.subheader("Income Statement Analysis")
-            
-            # Create metrics for income statement
-            income_metrics = [
-                'Total Revenue',
-                'Gross Profit',
-                'Operating Income',
-                'Net Income',
-                'EBITDA'
-            ]
-            
-            fig = create_financial_chart(income_stmt, "Key Income Statement Metrics Over Time", income_metrics)
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # Display raw data in expandable section
-            with st.expander("View Raw Data"):
-                st.dataframe(income_stmt.style.format("${:,.2f}"))
-        else:
-            st.warning("No income statement data available")
-    
-    with fin_tabs[2]:
-        if balance_sheet is not None and not balance_sheet.empty:
-            st.subheader("Balance Sheet Analysis")
-            
-            # Create metrics for balance sheet
-            balance_metrics = [
-                'Total Assets',
-                'Total Current Assets',
-                'Total Liabilities Net Minority Interest',
-                'Total Current Liabilities',
-                'Total Equity'
-            ]
-            
-            fig = create_financial_chart(balance_sheet, "Key Balance Sheet Metrics Over Time", balance_metrics)
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # Display raw data in expandable section
-            with st.expander("View Raw Data"):
-                st.dataframe(balance_sheet.style.format("${:,.2f}"))
-        else:
-            st.warning("No balance sheet data available")
-    
-    with fin_tabs[3]:
-        if cash_flow is not None and not cash_flow.empty:
-            st.subheader("Cash Flow Analysis")
-            
-            # Create metrics for cash flow
-            cash_flow_metrics = [
-                'Operating Cash Flow',
-                'Free Cash Flow',
-                'Cash Flow From Continuing Operating Activities',
-                'Capital Expenditure',
-                'Cash Flow From Financing Activities'
-            ]
-            
-            fig = create_financial_chart(cash_flow, "Key Cash Flow Metrics Over Time", cash_flow_metrics)
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # Display raw data in expandable section
-            with st.expander("View Raw Data"):
-                st.dataframe(cash_flow.style.format("${:,.2f}"))
-        else:
-            st.warning("No cash flow data available") 
\ No newline at end of file
+    # Format financial statements, cached per ticker so reruns skip the coercion and sort
+    income_stmt, balance_sheet, cash_flow = format_financial_statements(ticker_symbol, financial_data)
+    
+    # Create tabs for different financial statements; like the analysis tabs they track the
+    # active selection, so only the visible statement's chart is built on each fragment rerun
+    fin_tabs = st.tabs(["📊 Key Metrics", "💰 Income Statement", "📑 Balance Sheet", "💵 Cash Flow"],
+                       on_change="rerun", key="financials_tab")
+    
+    if fin_tabs[0].open:
+        with fin_tabs[0]:
+            if info:
+                for col, specs in zip(st.columns(len(KEY_METRIC_SPEC)), KEY_METRIC_SPEC):
+                    with col:
+                        for label, key, formatter in specs:
+                            st.metric(label, format_key_metric(info, key, formatter))
+    
+    if fin_tabs[1].open:
+        with fin_tabs[1]:
+            if income_stmt is not None and not income_stmt.empty:
+                st.subheader("Income Statement Analysis")
+                
+                # Create metrics for income statement
+                income_metrics = [
+                    'Total Revenue',
+                    'Gross Profit',
+                    'Operating Income',
+                    'Net Income',
+                    'EBITDA'
+                ]
+                
+                fig = create_financial_chart(income_stmt, "Key Income Statement Metrics Over Time", income_metrics)
+                if fig:
+                    st.plotly_chart(fig, use_container_width=True, key='income_chart')
+                
+                # Display raw data in expandable section
+                with st.expander("View Raw Data"):
+                    st.dataframe(income_stmt, column_config=money_column_config(income_stmt))
+            else:
+                st.warning("No income statement data available")
+    
+    if fin_tabs[2].open:
+        with fin_tabs[2]:
+            if balance_sheet is not None and not balance_sheet.empty:
+                st.subheader("Balance Sheet Analysis")
+                
+                # Create metrics for balance sheet, resolving alternate line-item names
+                balance_metrics = list(BALANCE_SHEET_CANDIDATES)
+                balance_rows = resolve_statement_rows(balance_sheet, BALANCE_SHEET_CANDIDATES)
+                
+                fig = create_financial_chart(balance_rows, "Key Balance Sheet Metrics Over Time", balance_metrics)
+                if fig:
+                    st.plotly_chart(fig, use_container_width=True, key='balance_chart')
+                
+                # Display raw data in expandable section
+                with st.expander("View Raw Data"):
+                    st.dataframe(balance_sheet, column_config=money_column_config(balance_sheet))
+            else:
+                st.warning("No balance sheet data available")
+    
+    if fin_tabs[3].open:
+        with fin_tabs[3]:
+            if cash_flow is not None and not cash_flow.empty:
+                st.subheader("Cash Flow Analysis")
+                
+                # Create metrics for cash flow
+                cash_flow_metrics = [
+                    'Operating Cash Flow',
+                    'Free Cash Flow',
+                    'Cash Flow From Continuing Operating Activities',
+                    'Capital Expenditure',
+                    'Cash Flow From Financing Activities'
+                ]
+                
+                fig = create_financial_chart(cash_flow, "Key Cash Flow Metrics Over Time", cash_flow_metrics)
+                if fig:
+                    st.plotly_chart(fig, use_container_width=True, key='cashflow_chart')
+                
+                # Display raw data in expandable section
+                with st.expander("View Raw Data"):
+                    st.dataframe(cash_flow, column_config=money_column_config(cash_flow))
+            else:
+                st.warning("No cash flow data available") 
\ No newline at end of file
@@ -1,18 +1,13 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 import logging
-import traceback
+import re
 import requests
-from bs4 import BeautifulSoup
-import json
-import time
 from .utils import get_stock_news, get_session
-import random
+from operator import itemgetter
+from ._indicators import njit
 
 # Configure logging
 logging.basicConfig(
@@ -21,123 +16,183 @@ logging.basicConfig(
 )
 logger = logging.getLogger('news_sentiment')
 
+# CSS selectors covering every news item layout each scraper recognizes
+YAHOO_NEWS_SELECTOR = (
+    'div[class~="Ov(h)"], div.IframeSecondaryStream, div[data-test="story"], '
+    'li.js-stream-content, div.news-link-container'
+)
+
+# Only the tags that can contain news items are parsed, so <head>, scripts and styles
+# outside them are never built into the tree; matching tags keep their whole subtree
+YAHOO_NEWS_TAGS = ['div', 'li']
+MARKETWATCH_NEWS_TAGS = ['div']
+
+# Fallback lookups as (tag name, attributes) in priority order, built once rather than per item
+YAHOO_TITLE_PATTERNS = ((['h3', 'a'], {}), ('div', {'class': 'text'}), ('div', {'class': 'headline'}))
+YAHOO_META_PATTERNS = (
+    ('div', {'class': ['C(#959595)', 'Fz(11px)']}),
+    ('div', {'class': 'source'}),
+    ('div', {'class': 'provider'}),
+)
+MARKETWATCH_ARTICLE_PATTERNS = (
+    ('div', {'class': 'article__content'}),
+    ('div', {'class': 'element element--article'}),
+    ('div', {'class': 'story__content'}),
+    ('div', {'class': 'article__wrap'}),
+)
+MARKETWATCH_TITLE_PATTERNS = (
+    ('a', {'class': 'link'}),
+    ('h3', {'class': 'article__headline'}),
+    ('a', {'class': 'headline__link'}),
+    ('h3', {'class': 'headline'}),
+)
+MARKETWATCH_TIMESTAMP_PATTERNS = (
+    ('span', {'class': 'article__timestamp'}),
+    ('div', {'class': 'article__details'}),
+    ('time', {'class': 'timestamp'}),
+    ('div', {'class': 'timestamp'}),
+)
+MARKETWATCH_SUMMARY_PATTERNS = (
+    ('p', {'class': 'article__summary'}),
+    ('div', {'class': 'article__description'}),
+    ('p', {'class': 'description'}),
+)
+
+# Sentiment words (simplified version), built once at import rather than per article
+_POS_WORDS = frozenset({
+    'buy', 'bullish', 'upward', 'growth', 'profit', 'positive', 'gain', 'surge',
+    'jump', 'rise', 'rising', 'higher', 'increase', 'increased', 'strong',
+    'strength', 'opportunity', 'opportunities', 'success', 'successful',
+    'improve', 'improved', 'improving', 'beat', 'beats', 'beating'
+})
+
+_NEG_WORDS = frozenset({
+    'sell', 'bearish', 'downward', 'decline', 'loss', 'negative', 'drop',
+    'plunge', 'fall', 'falling', 'lower', 'decrease', 'decreased', 'weak',
+    'weakness', 'risk', 'risks', 'fail', 'failed', 'failing', 'miss',
+    'misses', 'missing', 'down', 'debt', 'investigation'
+})
+
+# +1 for positive words and -1 for negative words, so scoring needs a single lookup per token;
+# keyed by bytes since sentiment text is tokenized as lowercased ASCII
+_WORD_WEIGHT = {
+    **{word.encode('ascii'): 1 for word in _POS_WORDS},
+    **{word.encode('ascii'): -1 for word in _NEG_WORDS},
+}
+
+# Words for sentiment scoring; punctuation is never part of a token, so "beats," still matches
+_TOKEN_RE = re.compile(rb"[a-z]+(?:'[a-z]+)?")
+
+# ASCII-only lowercasing table; the sentiment words are ASCII so the Unicode case map is not needed
+_LOWER_TABLE = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'abcdefghijklmnopqrstuvwxyz')
+
+def find_first(node, patterns):
+    """Return the match for the first pattern that finds anything, like chained find() calls joined by `or`"""
+    for name, attrs in patterns:
+        found = node.find(name, attrs)
+        if found:
+            return found
+    return None
+
+def find_all_first(node, patterns):
+    """Return every match for the first pattern that finds anything"""
+    for name, attrs in patterns:
+        found = node.find_all(name, attrs)
+        if found:
+            return found
+    return []
+
 @st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_yahoo_finance_news(ticker_symbol, max_retries=5, retry_delay=2):
-    """Get news from Yahoo Finance with retry logic and caching."""
-    for attempt in range(max_retries):
-        try:
-            # Add delay between retries
-            if attempt > 0:
-                delay = (retry_delay * (2 ** attempt)) + (random.random() * 0.5)
-                logger.info(f"Retry attempt {attempt + 1}/{max_retries} after {delay:.2f}s delay")
-                time.sleep(delay)
-            
-            urls = [
-                f"https://finance.yahoo.com/quote/{ticker_symbol}/news",
-                f"https://finance.yahoo.com/quote/{ticker_symbol}"
-            ]
-            
-            session = get_session()  # Use the shared session from utils.py
-            news_items = []
-            
-            for url in urls:
-                try:
-                    response = session.get(url, timeout=10)
-                    
-                    # Handle rate limiting
-                    if response.status_code == 429:
-                        logger.warning(f"Rate limited by Yahoo Finance (attempt {attempt + 1}/{max_retries})")
-                        continue
+def get_yahoo_finance_news(ticker_symbol):
+    """Get news from Yahoo Finance with caching; the shared session retries rate limits and server errors."""
+    from bs4 import BeautifulSoup, SoupStrainer
+    
+    try:
+        urls = [
+            f"https://finance.yahoo.com/quote/{ticker_symbol}/news",
+            f"https://finance.yahoo.com/quote/{ticker_symbol}"
+        ]
+        
+        session = get_session()  # Use the shared session from utils.py
+        news_items = []
+        seen_titles = set()
+        published = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # One timestamp for the whole scrape
+        
+        for url in urls:
+            try:
+                # Rate limits and server errors are retried with backoff by the session's adapter
+                response = session.get(url, timeout=10)
+                response.raise_for_status()
+                
+                soup = BeautifulSoup(response.content, 'lxml', from_encoding='utf-8', parse_only=SoupStrainer(YAHOO_NEWS_TAGS))
+                
+                # Match every news item pattern in a single pass over the document
+                for item in soup.select(YAHOO_NEWS_SELECTOR):
+                    try:
+                        # Try multiple patterns for title and link
+                        title_elem = find_first(item, YAHOO_TITLE_PATTERNS)
                         
-                    response.raise_for_status()
-                    
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Try multiple class patterns for news items
-                    news_containers = [
-                        soup.find_all('div', {'class': ['Ov(h)', 'IframeSecondaryStream']}),
-                        soup.find_all('div', {'data-test': 'story'}),
-                        soup.find_all('li', {'class': 'js-stream-content'}),
-                        soup.find_all('div', {'class': 'news-link-container'})
-                    ]
-                    
-                    for container in news_containers:
-                        if container:
-                            for item in container:
-                                try:
-                                    # Try multiple patterns for title and link
-                                    title_elem = (
-                                        item.find(['h3', 'a']) or 
-                                        item.find('div', {'class': 'text'}) or
-                                        item.find('div', {'class': 'headline'})
-                                    )
-                                    
-                                    if not title_elem:
-                                        continue
-                                    
-                                    title = title_elem.text.strip()
-                                    link = title_elem.get('href', '')
-                                    
-                                    if not link and title_elem.parent.name == 'a':
-                                        link = title_elem.parent.get('href', '')
-                                    
-                                    if link and not link.startswith('http'):
-                                        link = 'https://finance.yahoo.com' + link
-                                    
-                                    # Try multiple patterns for publisher and time
-                                    meta = (
-                                        item.find('div', {'class': ['C(#959595)', 'Fz(11px)']}) or
-                                        item.find('div', {'class': 'source'}) or
-                                        item.find('div', {'class': 'provider'})
-                                    )
-                                    
-                                    publisher = "Yahoo Finance"
-                                    if meta:
-                                        publisher_text = meta.text.split('·')[0].strip()
-                                        if publisher_text:
-                                            publisher = publisher_text
-                                    
-                                    if title and link:
-                                        news_item = {
-                                            'title': title,
-                                            'link': link,
-                                            'publisher': publisher,
-                                            'published': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                            'type': 'STORY',
-                                            'summary': ''
-                                        }
-                                        
-                                        # Check for duplicates before adding
-                                        if not any(x['title'] == title for x in news_items):
-                                            news_items.append(news_item)
-                                            
-                                            if len(news_items) >= 10:
-                                                return news_items
-                                                
-                                except Exception as e:
-                                    logger.warning(f"Error parsing Yahoo Finance news item: {str(e)}")
-                                    continue
-                                    
-                    if news_items:
-                        break
+                        if not title_elem:
+                            continue
                         
-                except requests.RequestException as e:
-                    logger.warning(f"Error fetching from {url}: {str(e)}")
-                    continue
-            
-            if news_items:
-                return news_items
-                
-        except Exception as e:
-            logger.error(f"Error in get_yahoo_finance_news (attempt {attempt + 1}/{max_retries}): {str(e)}")
-            if attempt == max_retries - 1:
-                return []
+                        title = title_elem.text.strip()
+                        link = title_elem.get('href', '')
+                        
+                        if not link and title_elem.parent.name == 'a':
+                            link = title_elem.parent.get('href', '')
+                        
+                        if link and not link.startswith('http'):
+                            link = 'https://finance.yahoo.com' + link
+                        
+                        # Try multiple patterns for publisher and time
+                        meta = find_first(item, YAHOO_META_PATTERNS)
+                        
+                        publisher = "Yahoo Finance"
+                        if meta:
+                            publisher_text = meta.text.split('·')[0].strip()
+                            if publisher_text:
+                                publisher = publisher_text
+                        
+                        if title and link:
+                            news_item = {
+                                'title': title,
+                                'link': link,
+                                'publisher': publisher,
+                                'published': published,
+                                'type': 'STORY',
+                                'summary': ''
+                            }
+                            
+                            # Check for duplicates before adding
+                            if title not in seen_titles:
+                                seen_titles.add(title)
+                                news_items.append(news_item)
+                                
+                                if len(news_items) >= 10:
+                                    return news_items
+                                    
+                    except Exception as e:
+                        logger.warning(f"Error parsing Yahoo Finance news item: {str(e)}")
+                        continue
+                                
+                if news_items:
+                    break
+                    
+            except requests.RequestException as e:
+                logger.warning(f"Error fetching from {url}: {str(e)}")
+                continue
+        
+        return news_items
     
-    return []
+    except Exception as e:
+        logger.error(f"Error in get_yahoo_finance_news: {str(e)}")
+        return []
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_marketwatch_news(ticker_symbol, limit=10):
     """Fetch news from MarketWatch with caching"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    
     try:
         url = f"https://www.marketwatch.com/investing/stock/{ticker_symbol}"
         session = get_session()  # Use the shared session from utils.py
@@ -145,26 +200,17 @@ def get_marketwatch_news(ticker_symbol, limit=10):
         response = session.get(url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', from_encoding='utf-8', parse_only=SoupStrainer(MARKETWATCH_NEWS_TAGS))
         news_items = []
+        now = datetime.now()  # Relative timestamps are resolved against one reference time
         
         # Find news articles - try multiple selectors
-        articles = (
-            soup.find_all('div', class_='article__content') or
-            soup.find_all('div', class_='element element--article') or
-            soup.find_all('div', class_='story__content') or
-            soup.find_all('div', class_='article__wrap')
-        )
+        articles = find_all_first(soup, MARKETWATCH_ARTICLE_PATTERNS)
         
         for article in articles[:limit]:
             try:
                 # Try multiple patterns for title
-                title_elem = (
-                    article.find('a', class_='link') or
-                    article.find('h3', class_='article__headline') or
-                    article.find('a', class_='headline__link') or
-                    article.find('h3', class_='headline')
-                )
+                title_elem = find_first(article, MARKETWATCH_TITLE_PATTERNS)
                 
                 if not title_elem:
                     continue
@@ -176,15 +222,10 @@ def get_marketwatch_news(ticker_symbol, limit=10):
                     link = f"https://www.marketwatch.com{link}"
                 
                 # Try multiple patterns for timestamp
-                timestamp_elem = (
-                    article.find('span', class_='article__timestamp') or
-                    article.find('div', class_='article__details') or
-                    article.find('time', class_='timestamp') or
-                    article.find('div', class_='timestamp')
-                )
+                timestamp_elem = find_first(article, MARKETWATCH_TIMESTAMP_PATTERNS)
                 
                 # Default to current time if no timestamp found
-                timestamp = datetime.now()
+                timestamp = now
                 
                 if timestamp_elem:
                     timestamp_text = timestamp_elem.text.strip().lower()
@@ -193,32 +234,28 @@ def get_marketwatch_news(ticker_symbol, limit=10):
                         if 'ago' in timestamp_text:
                             value = int(''.join(filter(str.isdigit, timestamp_text)))
                             if 'minute' in timestamp_text or 'min' in timestamp_text:
-                                timestamp = datetime.now() - timedelta(minutes=value)
+                                timestamp = now - timedelta(minutes=value)
                             elif 'hour' in timestamp_text or 'hr' in timestamp_text:
-                                timestamp = datetime.now() - timedelta(hours=value)
+                                timestamp = now - timedelta(hours=value)
                             elif 'day' in timestamp_text:
-                                timestamp = datetime.now() - timedelta(days=value)
+                                timestamp = now - timedelta(days=value)
                             elif 'week' in timestamp_text:
-                                timestamp = datetime.now() - timedelta(weeks=value)
+                                timestamp = now - timedelta(weeks=value)
                             elif 'month' in timestamp_text:
-                                timestamp = datetime.now() - timedelta(days=value * 30)
+                                timestamp = now - timedelta(days=value * 30)
                         # Handle absolute time formats
                         elif ':' in timestamp_text:  # Today's time
                             time_parts = timestamp_text.split(':')
                             if len(time_parts) == 2:
                                 hour, minute = map(int, time_parts)
-                                timestamp = datetime.now().replace(hour=hour, minute=minute)
+                                timestamp = now.replace(hour=hour, minute=minute)
                         elif '/' in timestamp_text:  # Date format
                             timestamp = datetime.strptime(timestamp_text, '%m/%d/%Y')
                     except Exception as e:
                         logger.warning(f"Error parsing timestamp '{timestamp_text}': {str(e)}")
                 
                 # Try to get summary
-                summary_elem = (
-                    article.find('p', class_='article__summary') or
-                    article.find('div', class_='article__description') or
-                    article.find('p', class_='description')
-                )
+                summary_elem = find_first(article, MARKETWATCH_SUMMARY_PATTERNS)
                 summary = summary_elem.text.strip() if summary_elem else ""
                 
                 news_item = {
@@ -250,78 +287,6 @@ def get_marketwatch_news(ticker_symbol, limit=10):
         logger.error(f"Error fetching MarketWatch news: {str(e)}")
         return None
 
-def get_seeking_alpha_news(ticker_symbol):
-    """Get news from Seeking Alpha."""
-    try:
-        url = f"https://seekingalpha.com/symbol/{ticker_symbol}/news"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        news_items = []
-        
-        # Try multiple patterns for news containers
-        news_containers = [
-            soup.find_all('div', {'data-test-id': 'post-list-item'}),
-            soup.find_all('article'),
-            soup.find_all('div', {'class': ['news-item', 'media-preview-content']})
-        ]
-        
-        for container in news_containers:
-            if container:
-                for item in container:
-                    try:
-                        # Find title and link
-                        title_elem = (
-                            item.find('a', {'data-test-id': 'post-list-item-title'}) or
-                            item.find(['h3', 'h4']) or
-                            item.find('a', {'class': 'title'})
-                        )
-                        
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.text.strip()
-                        link = title_elem.get('href', '')
-                        
-                        if link and not link.startswith('http'):
-                            link = 'https://seekingalpha.com' + link
-                        
-                        # Create news item
-                        if title and link:
-                            news_item = {
-                                'title': title,
-                                'link': link,
-                                'publisher': 'Seeking Alpha',
-                                'providerPublishTime': int(datetime.now().timestamp()),
-                                'type': 'STORY',
-                                'summary': ''
-                            }
-                            news_items.append(news_item)
-                            
-                            if len(news_items) >= 10:
-                                return news_items
-                                
-                    except Exception as e:
-                        logger.warning(f"Error parsing Seeking Alpha news item: {str(e)}")
-                        continue
-        
-        return news_items
-        
-    except requests.RequestException as e:
-        logger.error(f"Network error fetching Seeking Alpha news: {str(e)}")
-        return []
-    except Exception as e:
-        logger.error(f"Error fetching Seeking Alpha news: {str(e)}")
-        return []
-
 def validate_news_item(item):
     """Validate if a news item has all required fields"""
     required_fields = ['title', 'link', 'publisher']
@@ -366,10 +331,12 @@ def show_news_sentiment(ticker_symbol):
         with st.spinner('Fetching news articles...'):
             # First try to get news from Yahoo Finance with caching
             news_items = get_stock_news(ticker_symbol)
-            valid_news = []
+            # Valid articles keyed by title, so duplicates are dropped as they are collected
+            news_by_title = {}
             
             if news_items:
                 logger.info(f"Found {len(news_items)} news items from yfinance")
+                now_ts = datetime.now().timestamp()  # Fallback publish time for items without one
                 
                 for item in news_items:
                     # Log the item structure for debugging
@@ -409,13 +376,13 @@ def show_news_sentiment(ticker_symbol):
                             'title': title,
                             'link': link,
                             'publisher': item.get('publisher', 'Yahoo Finance'),
-                            'published': format_date(item.get('providerPublishTime', datetime.now().timestamp())),
+                            'published': format_date(item.get('providerPublishTime', now_ts)),
                             'summary': item.get('description', item.get('summary', '')),
                             'type': item.get('type', 'STORY')
                         }
                         
                         if validate_news_item(valid_item):
-                            valid_news.append(valid_item)
+                            news_by_title.setdefault(valid_item['title'], valid_item)
                             logger.info(f"Added valid news item: {valid_item['title']}")
                         else:
                             logger.warning(f"Invalid news item: {valid_item}")
@@ -423,20 +390,18 @@ def show_news_sentiment(ticker_symbol):
                         logger.warning("Could not find title in news item")
             
             # If no valid news from Yahoo Finance, try MarketWatch
-            if not valid_news:
+            if not news_by_title:
                 logger.info("No valid news items from Yahoo Finance, trying MarketWatch")
                 marketwatch_news = get_marketwatch_news(ticker_symbol)
                 
                 if marketwatch_news:
-                    valid_news.extend(marketwatch_news)
+                    for item in marketwatch_news:
+                        news_by_title.setdefault(item['title'], item)
                     logger.info(f"Added {len(marketwatch_news)} valid MarketWatch articles")
             
-            if valid_news:
-                # Sort news by date if available
-                try:
-                    valid_news.sort(key=lambda x: datetime.strptime(x['published'], '%Y-%m-%d %H:%M:%S'), reverse=True)
-                except Exception as e:
-                    logger.warning(f"Error sorting news by date: {str(e)}")
+            if news_by_title:
+                # Sort news by date; 'YYYY-MM-DD HH:MM:SS' strings order chronologically as they are
+                valid_news = sorted(news_by_title.values(), key=itemgetter('published'), reverse=True)
                 
                 # Display news articles in a modern card layout
                 for article in valid_news:
@@ -476,7 +441,7 @@ def show_news_sentiment(ticker_symbol):
                 )
                 
     except Exception as e:
-        logger.error(f"Error in show_news_sentiment: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Error in show_news_sentiment: %s", e)
         st.error(
             """Unable to fetch news articles. This could be due to:
             - Service disruption
@@ -523,35 +488,34 @@ def show_recent_news(news):
                 f"({publish_time.strftime('%Y-%m-%d %H:%M')})"
             ):
                 try:
-                    # Display article details
+                    # Assemble the article details into one Markdown block so each
+                    # article sends a single element instead of one per field
+                    sections = []
                     if article.get('link'):
-                        st.markdown(f"[Read Full Article]({article['link']})")
+                        sections.append(f"[Read Full Article]({article['link']})")
                     
                     if article.get('summary'):
-                        st.write("**Summary:**")
-                        st.write(article['summary'])
+                        sections.append(f"**Summary:**\n\n{article['summary']}")
                     else:
-                        st.write("*No summary available*")
+                        sections.append("*No summary available*")
                     
-                    # Display additional metadata in columns
-                    col1, col2 = st.columns(2)
+                    details = []
+                    if article.get('type'):
+                        details.append(f"**Type:** {article['type']}")
+                    if article.get('relatedTickers'):
+                        details.append(f"**Related Tickers:** {', '.join(article['relatedTickers'])}")
+                    if article.get('publisher'):
+                        details.append(f"**Publisher:** {article['publisher']}")
+                    details.append(f"**Published:** {publish_time.strftime('%Y-%m-%d %H:%M')}")
                     
-                    with col1:
-                        if article.get('type'):
-                            st.write(f"**Type:** {article['type']}")
-                        if article.get('relatedTickers'):
-                            st.write(f"**Related Tickers:** {', '.join(article['relatedTickers'])}")
+                    # Add source reliability indicator if available
+                    if article.get('publisher') in ['Reuters', 'Bloomberg', 'CNBC', 'Financial Times']:
+                        details.append("**Source Quality:** 🟢 High Reliability")
+                    elif article.get('publisher'):
+                        details.append("**Source Quality:** 🟡 Standard Source")
                     
-                    with col2:
-                        if article.get('publisher'):
-                            st.write(f"**Publisher:** {article['publisher']}")
-                        st.write(f"**Published:** {publish_time.strftime('%Y-%m-%d %H:%M')}")
-                        
-                        # Add source reliability indicator if available
-                        if article.get('publisher') in ['Reuters', 'Bloomberg', 'CNBC', 'Financial Times']:
-                            st.write("**Source Quality:** 🟢 High Reliability")
-                        elif article.get('publisher'):
-                            st.write("**Source Quality:** 🟡 Standard Source")
+                    sections.append("  \n".join(details))
+                    st.markdown("\n\n".join(sections))
                 
                 except Exception as e:
                     logger.error(f"Error displaying article: {str(e)}")
@@ -559,28 +523,25 @@ def show_recent_news(news):
                     continue
     
     except Exception as e:
-        logger.error(f"Error in show_recent_news: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Error in show_recent_news: %s", e)
         st.error("Error displaying news articles")
 
 def show_sentiment_analysis(news, ticker_symbol):
     """Display sentiment analysis of news articles."""
     
+    import plotly.graph_objects as go
+    
     st.subheader("Sentiment Analysis")
     
     try:
-        # Prepare data for sentiment analysis
-        sentiments = []
-        dates = []
-        
-        for article in news:
-            sentiment = analyze_article_sentiment(article)
-            sentiments.append(sentiment)
-            dates.append(datetime.fromtimestamp(article.get('providerPublishTime', 0)))
-        
-        if not sentiments:
+        if not news:
             st.warning("No articles available for sentiment analysis")
             return
         
+        # Score every article in one batch; the array feeds the charts and statistics below
+        scores = analyze_articles_sentiment(news)
+        dates = [datetime.fromtimestamp(article.get('providerPublishTime', 0)) for article in news]
+        
         # Create sentiment timeline
         fig = go.Figure()
         
@@ -588,13 +549,13 @@ def show_sentiment_analysis(news, ticker_symbol):
         fig.add_trace(
             go.Scatter(
                 x=dates,
-                y=sentiments,
+                y=scores,
                 mode='lines+markers',
                 name='Sentiment Score',
                 line=dict(color='lightblue'),
                 marker=dict(
                     size=8,
-                    color=sentiments,
+                    color=scores,
                     colorscale='RdYlGn',
                     showscale=True,
                     colorbar=dict(title='Sentiment')
@@ -617,7 +578,7 @@ def show_sentiment_analysis(news, ticker_symbol):
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            avg_sentiment = np.mean(sentiments)
+            avg_sentiment = scores.mean()
             st.metric(
                 "Average Sentiment",
                 f"{avg_sentiment:.2f}",
@@ -626,7 +587,7 @@ def show_sentiment_analysis(news, ticker_symbol):
             )
         
         with col2:
-            positive_ratio = sum(1 for s in sentiments if s > 0) / len(sentiments)
+            positive_ratio = (scores > 0).mean()
             st.metric(
                 "Positive News Ratio",
                 f"{positive_ratio:.1%}",
@@ -635,7 +596,7 @@ def show_sentiment_analysis(news, ticker_symbol):
             )
         
         with col3:
-            sentiment_volatility = np.std(sentiments)
+            sentiment_volatility = scores.std()
             st.metric(
                 "Sentiment Volatility",
                 f"{sentiment_volatility:.2f}",
@@ -643,13 +604,16 @@ def show_sentiment_analysis(news, ticker_symbol):
                 delta_color="normal"
             )
         
-        # Display sentiment distribution
+        # Display sentiment distribution, binned here so the figure carries 20 counts
+        # rather than every score for the browser to bin
+        counts, edges = np.histogram(scores, bins=20)
         fig_dist = go.Figure()
         
         fig_dist.add_trace(
-            go.Histogram(
-                x=sentiments,
-                nbinsx=20,
+            go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=counts,
+                width=np.diff(edges),
                 name='Sentiment Distribution',
                 marker_color='lightblue'
             )
@@ -666,12 +630,14 @@ def show_sentiment_analysis(news, ticker_symbol):
         st.plotly_chart(fig_dist, use_container_width=True)
         
     except Exception as e:
-        logger.error(f"Error in show_sentiment_analysis: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Error in show_sentiment_analysis: %s", e)
         st.error("Error performing sentiment analysis")
 
 def show_news_impact(news, hist, ticker_symbol):
     """Display analysis of news impact on stock price."""
     
+    import plotly.graph_objects as go
+    
     st.subheader("News Impact Analysis")
     
     try:
@@ -692,19 +658,26 @@ def show_news_impact(news, hist, ticker_symbol):
             )
         )
         
-        # Add markers for news events
-        news_dates = []
-        news_prices = []
-        news_texts = []
+        # One row per article, joined to the trading day it was published on
+        closes = hist['Close'].to_numpy()
+        events = pd.DataFrame(
+            [(article.get('providerPublishTime', 0), article.get('title', 'No title')) for article in news],
+            columns=['published', 'title']
+        )
+        published = pd.to_datetime(events['published'], unit='s', utc=True)
+        published = published.dt.tz_convert(hist.index.tz) if hist.index.tz is not None else published.dt.tz_localize(None)
+        events['day'] = published.dt.normalize()
         
-        for article in news:
-            date = datetime.fromtimestamp(article.get('providerPublishTime', 0))
-            if date in hist.index:
-                news_dates.append(date)
-                news_prices.append(hist.loc[date, 'Close'])
-                news_texts.append(article.get('title', 'No title'))
+        trading_days = pd.DataFrame({'day': hist.index.normalize(), 'position': np.arange(len(hist))})
+        events = events.merge(trading_days.drop_duplicates('day'), on='day', how='inner', sort=False)
+        
+        # Add markers for news events
+        news_positions = events['position'].to_numpy()
+        news_dates = hist.index[news_positions]
+        news_prices = closes[news_positions]
+        news_texts = events['title'].tolist()
         
-        if news_dates:
+        if len(news_positions):
             fig.add_trace(
                 go.Scatter(
                     x=news_dates,
@@ -737,77 +710,80 @@ def show_news_impact(news, hist, ticker_symbol):
         st.plotly_chart(fig, use_container_width=True)
         
         # Analyze price movements following news
-        if news_dates:
+        if len(news_positions):
             st.write("**Significant Price Moves Following News:**")
             
-            for i, date in enumerate(news_dates):
-                if date in hist.index:
-                    # Look at price change in next 2 days
-                    start_price = hist.loc[date, 'Close']
-                    future_prices = hist.loc[date:].head(3)['Close']
+            # Highest and lowest close over each bar and the two after it, computed once for every event
+            reversed_close = hist['Close'].iloc[::-1]
+            forward_max = reversed_close.rolling(3, min_periods=1).max().to_numpy()[::-1]
+            forward_min = reversed_close.rolling(3, min_periods=1).min().to_numpy()[::-1]
+            
+            for i, (date, position) in enumerate(zip(news_dates, news_positions)):
+                # Look at price change in next 2 days
+                if position < len(closes) - 1:
+                    start_price = closes[position]
+                    max_change = ((forward_max[position] - start_price) / start_price) * 100
+                    min_change = ((forward_min[position] - start_price) / start_price) * 100
                     
-                    if len(future_prices) > 1:
-                        max_change = ((future_prices.max() - start_price) / start_price) * 100
-                        min_change = ((future_prices.min() - start_price) / start_price) * 100
-                        
-                        if abs(max_change) > 1 or abs(min_change) > 1:  # Only show significant moves (>1%)
-                            st.write(f"After news on {date.strftime('%Y-%m-%d')}:")
-                            st.write(f"- Maximum price change: {max_change:+.2f}%")
-                            st.write(f"- Minimum price change: {min_change:+.2f}%")
-                            st.write(f"- News: {news_texts[i]}")
-                            st.write("---")
+                    if abs(max_change) > 1 or abs(min_change) > 1:  # Only show significant moves (>1%)
+                        st.write(f"After news on {date.strftime('%Y-%m-%d')}:")
+                        st.write(f"- Maximum price change: {max_change:+.2f}%")
+                        st.write(f"- Minimum price change: {min_change:+.2f}%")
+                        st.write(f"- News: {news_texts[i]}")
+                        st.write("---")
         
     except Exception as e:
-        logger.error(f"Error in show_news_impact: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Error in show_news_impact: %s", e)
         st.error("Error analyzing news impact")
 
-def analyze_article_sentiment(article):
-    """Calculate sentiment score for a news article."""
-    
-    try:
-        # Initialize sentiment score
-        sentiment_score = 0
-        
-        # Get text to analyze
-        title = article.get('title', '').lower()
-        summary = article.get('summary', '').lower()
-        
-        # Define sentiment words (simplified version)
-        positive_words = {
-            'buy', 'bullish', 'upward', 'growth', 'profit', 'positive', 'gain', 'surge',
-            'jump', 'rise', 'rising', 'higher', 'increase', 'increased', 'strong',
-            'strength', 'opportunity', 'opportunities', 'success', 'successful',
-            'improve', 'improved', 'improving', 'beat', 'beats', 'beating'
-        }
-        
-        negative_words = {
-            'sell', 'bearish', 'downward', 'decline', 'loss', 'negative', 'drop',
-            'plunge', 'fall', 'falling', 'lower', 'decrease', 'decreased', 'weak',
-            'weakness', 'risk', 'risks', 'fail', 'failed', 'failing', 'miss',
-            'misses', 'missing', 'down', 'debt', 'investigation'
-        }
-        
-        # Count sentiment words in title (weighted more heavily)
-        for word in title.split():
-            if word in positive_words:
-                sentiment_score += 0.5
-            elif word in negative_words:
-                sentiment_score -= 0.5
-        
-        # Count sentiment words in summary
-        for word in summary.split():
-            if word in positive_words:
-                sentiment_score += 0.25
-            elif word in negative_words:
-                sentiment_score -= 0.25
-        
-        # Normalize score to range [-1, 1]
-        max_possible_score = (len(title.split()) + len(summary.split())) * 0.5
-        if max_possible_score > 0:
-            sentiment_score = sentiment_score / max_possible_score
-        
-        return sentiment_score
+def _article_text(article, field):
+    """Text of an article field, or '' when it is missing or not a string."""
+    text = article.get(field) or ''
+    return text if isinstance(text, str) else ''
+
+def _ascii_lower(text):
+    """Lowercased ASCII bytes of text; other characters become '?' so they still separate words."""
+    return text.encode('ascii', 'replace').translate(_LOWER_TABLE)
+
+def _field_token_weights(articles, field):
+    """Per-article token counts and the flattened token weights for one text field."""
+    tokens = [_TOKEN_RE.findall(_ascii_lower(_article_text(article, field))) for article in articles]
+    lengths = np.fromiter((len(words) for words in tokens), dtype=np.int64, count=len(tokens))
+    word_weight = _WORD_WEIGHT
+    weights = np.fromiter(
+        (word_weight.get(word, 0) for words in tokens for word in words),
+        dtype=np.int8, count=int(lengths.sum())
+    )
+    return lengths, weights
+
+@njit(cache=True)
+def _fold_sentiment(title_lengths, title_weights, summary_lengths, summary_weights):
+    """Per-article sentiment scores from flattened int8 token weights in a single pass."""
+    count = title_lengths.shape[0]
+    out = np.zeros(count)
+    title_pos = 0
+    summary_pos = 0
+    for i in range(count):
+        title_net = 0
+        for j in range(title_pos, title_pos + title_lengths[i]):
+            title_net += title_weights[j]
+        summary_net = 0
+        for j in range(summary_pos, summary_pos + summary_lengths[i]):
+            summary_net += summary_weights[j]
+        title_pos += title_lengths[i]
+        summary_pos += summary_lengths[i]
+        
+        # Title words weigh 0.5 and summary words 0.25; both are kept as integer quarters and
+        # normalized by the same weights applied to the token counts, so the score stays in [-1, 1];
+        # articles without tokens score 0
+        max_possible_quarters = 2 * title_lengths[i] + summary_lengths[i]
+        if max_possible_quarters > 0:
+            out[i] = (2 * title_net + summary_net) / max_possible_quarters
     
-    except Exception as e:
-        logger.error(f"Error in analyze_article_sentiment: {str(e)}\n{traceback.format_exc()}")
-        return 0  # Return neutral sentiment on error 
\ No newline at end of file
+    return out
+
+def analyze_articles_sentiment(articles):
+    """Sentiment scores in [-1, 1] for a batch of articles, weighting title words above summary words."""
+    title_lengths, title_weights = _field_token_weights(articles, 'title')
+    summary_lengths, summary_weights = _field_token_weights(articles, 'summary')
+    return _fold_sentiment(title_lengths, title_weights, summary_lengths, summary_weights)
@@ -1,11 +1,14 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime
 import plotly.express as px
+from .utils import get_batch_history, get_stock_info, script_thread_pool
+
+# Benchmark used for portfolio performance comparison
+BENCHMARK_TICKER = 'SPY'
 
 def show_portfolio_analyzer():
     """Display portfolio analysis tools."""
@@ -63,7 +66,7 @@ def show_portfolio_analyzer():
             # Show loading message
             with st.spinner('Analyzing portfolio...'):
                 # Get stock data and calculate portfolio metrics
-                portfolio_data = get_portfolio_data(tickers, shares, dates)
+                portfolio_data, benchmark_hist = get_portfolio_data(tickers, shares, dates)
                 
                 if portfolio_data:
                     # Create tabs for different analyses
@@ -79,7 +82,7 @@ def show_portfolio_analyzer():
                         show_portfolio_summary(portfolio_data)
                     
                     with portfolio_tabs[1]:
-                        show_portfolio_performance(portfolio_data)
+                        show_portfolio_performance(portfolio_data, benchmark_hist)
                     
                     with portfolio_tabs[2]:
                         show_portfolio_risk_analysis(portfolio_data)
@@ -107,18 +110,25 @@ def show_portfolio_analyzer():
 
 
 def get_portfolio_data(tickers, shares, dates):
-    """Fetch and calculate portfolio data."""
+    """Fetch and calculate portfolio data, returning the holdings and the benchmark history."""
     
     portfolio_data = []
     total_value = 0
     
+    # Fetch all holdings and the benchmark in one batched download, with the per-holding
+    # info requests running alongside it as in the comparison view
+    unique_tickers = list(dict.fromkeys(tickers))
+    with script_thread_pool(len(unique_tickers) + 1) as executor:
+        history_future = executor.submit(get_batch_history, tickers + [BENCHMARK_TICKER], period='1y')
+        infos = dict(zip(unique_tickers, executor.map(get_stock_info, unique_tickers)))
+        histories = history_future.result()
+    
     for ticker, share_count, purchase_date in zip(tickers, shares, dates):
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            hist = stock.history(period='1y')
+            info = infos.get(ticker)
+            hist = histories.get(ticker)
             
-            if not hist.empty and info:
+            if hist is not None and not hist.empty and info:
                 current_price = hist['Close'].iloc[-1]
                 purchase_price = hist.loc[purchase_date:].iloc[0]['Close'] if purchase_date in hist.index else current_price
                 market_value = current_price * share_count
@@ -149,7 +159,7 @@ def get_portfolio_data(tickers, shares, dates):
         except Exception as e:
             st.warning(f"Could not fetch data for {ticker}: {str(e)}")
     
-    return portfolio_data
+    return portfolio_data, histories.get(BENCHMARK_TICKER)
 
 
 def show_portfolio_summary(portfolio_data):
@@ -256,8 +266,8 @@ def show_portfolio_summary(portfolio_data):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_portfolio_performance(portfolio_data):
-    """Display portfolio performance analysis."""
+def show_portfolio_performance(portfolio_data, benchmark_hist=None):
+    """Display portfolio performance analysis against the benchmark history from get_portfolio_data."""
     
     st.subheader('Portfolio Performance')
     
@@ -274,14 +284,14 @@ def show_portfolio_performance(portfolio_data):
     portfolio_values = pd.Series(0.0, index=dates)
     benchmark_values = pd.Series(0.0, index=dates)
     
-    # Get SPY data for benchmark comparison
+    # SPY data for benchmark comparison, fetched in the same batch download as the holdings
     try:
-        spy = yf.Ticker('SPY')
-        spy_hist = spy.history(period='1y')
-        if not spy_hist.empty:
-            # Convert index to timezone-naive
-            spy_hist.index = spy_hist.index.tz_localize(None)
-            benchmark_values = spy_hist['Close'] / spy_hist['Close'].iloc[0] * 100
+        if benchmark_hist is None or benchmark_hist.empty:
+            st.warning("Could not fetch benchmark (SPY) data")
+        else:
+            # Convert index to timezone-naive without touching the shared frame
+            spy_close = benchmark_hist['Close'].tz_localize(None)
+            benchmark_values = spy_close / spy_close.iloc[0] * 100
     except:
         st.warning("Could not fetch benchmark (SPY) data")
     
@@ -390,12 +400,14 @@ def show_portfolio_risk_analysis(portfolio_data):
     
     st.subheader('Risk Analysis')
     
-    # Calculate correlation matrix
-    returns_data = {}
-    for stock in portfolio_data:
-        returns_data[stock['Ticker']] = stock['Historical Data']['Close'].pct_change()
+    # Daily returns per holding, each on its own trading calendar, computed once for the
+    # correlation matrix and the risk rows
+    returns_df = pd.DataFrame({
+        stock['Ticker']: stock['Historical Data']['Close'].dropna().pct_change(fill_method=None)
+        for stock in portfolio_data
+    })
     
-    returns_df = pd.DataFrame(returns_data)
+    # Calculate correlation matrix
     correlation = returns_df.corr()
     
     # Create correlation heatmap
@@ -425,7 +437,7 @@ def show_portfolio_risk_analysis(portfolio_data):
     
     risk_data = []
     for stock in portfolio_data:
-        returns = stock['Historical Data']['Close'].pct_change()
+        returns = returns_df[stock['Ticker']]
         beta = stock['Beta']
         volatility = returns.std() * np.sqrt(252) * 100  # Annualized volatility
         
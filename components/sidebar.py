@@ -11,21 +11,24 @@ def create_sidebar():
     
     # Stock selection (for single stock analysis)
     if tab_selection == "Stock Analysis":
-        st.sidebar.header('Stock Selection')
-        ticker_symbol = st.sidebar.text_input('Enter Stock Ticker', 'AAPL')
-        period = st.sidebar.selectbox(
+        # Group the analysis inputs in a form so changes only trigger a rerun on submit
+        form = st.sidebar.form('analysis_inputs')
+        
+        form.header('Stock Selection')
+        ticker_symbol = form.text_input('Enter Stock Ticker', 'AAPL')
+        period = form.selectbox(
             'Select Time Period', 
             ['1mo', '3mo', '6mo', '1y', '2y', '5y', 'max'], 
             index=3
         )
         
         # Technical indicator selection (will be used in technical analysis)
-        st.sidebar.header('Technical Indicators')
+        form.header('Technical Indicators')
         
         # Moving Averages
-        show_ma = st.sidebar.checkbox('Show Moving Averages', True)
+        show_ma = form.checkbox('Show Moving Averages', True)
         if show_ma:
-            ma_periods = st.sidebar.multiselect(
+            ma_periods = form.multiselect(
                 'Select MA Periods',
                 [5, 10, 20, 50, 100, 200],
                 default=[20, 50, 200]
@@ -34,14 +37,16 @@ def create_sidebar():
             ma_periods = []
         
         # Add indicators options
-        show_rsi = st.sidebar.checkbox('Show RSI', True)
-        show_macd = st.sidebar.checkbox('Show MACD', True)
-        show_bollinger = st.sidebar.checkbox('Show Bollinger Bands', True)
+        show_rsi = form.checkbox('Show RSI', True)
+        show_macd = form.checkbox('Show MACD', True)
+        show_bollinger = form.checkbox('Show Bollinger Bands', True)
         
         # Risk analysis options
-        st.sidebar.header('Risk Analysis')
-        show_volatility = st.sidebar.checkbox('Show Volatility', True)
-        show_drawdown = st.sidebar.checkbox('Show Max Drawdown', True)
+        form.header('Risk Analysis')
+        show_volatility = form.checkbox('Show Volatility', True)
+        show_drawdown = form.checkbox('Show Max Drawdown', True)
+        
+        form.form_submit_button('Update Analysis', use_container_width=True)
         
         return {
             'tab_selection': tab_selection,
@@ -1,5 +1,4 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
@@ -7,6 +6,8 @@ from plotly.subplots import make_subplots
 import logging
 import traceback
 from datetime import datetime
+from .utils import get_stock_history
+from . import _indicators, _indicators_gpu
 
 # Configure logging
 logging.basicConfig(
@@ -37,11 +38,10 @@ def show_technical_analysis(ticker_symbol, period, indicators):
     logger.info(f"Analyzing technical indicators for {ticker_symbol} over {period}")
     
     try:
-        # Get historical data
-        stock = yf.Ticker(ticker_symbol)
-        hist = stock.history(period=period)
+        # Get historical data (cached and shared with the Charts tab)
+        hist = get_stock_history(ticker_symbol, period)
         
-        if hist.empty:
+        if hist is None or hist.empty:
             logger.warning(f"No historical data available for {ticker_symbol}")
             st.error(f"No historical data available for {ticker_symbol}")
             return
@@ -93,9 +93,10 @@ def show_moving_averages(hist, ma_periods):
     
     st.subheader('Moving Averages')
     
-    # Add moving averages to the data
+    # Add moving averages to the data, computing every window in one pass
+    moving_averages = calculate_moving_averages(hist['Close'], ma_periods)
     for period in ma_periods:
-        hist[f'MA_{period}'] = hist['Close'].rolling(window=period).mean()
+        hist[f'MA_{period}'] = moving_averages[period]
     
     # Check for golden cross and death cross
     if 'MA_50' in hist.columns and 'MA_200' in hist.columns:
@@ -147,7 +148,7 @@ def show_moving_averages(hist, ma_periods):
     
     # Add price
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             x=hist.index,
             y=hist['Close'],
             name='Close Price',
@@ -160,7 +161,7 @@ def show_moving_averages(hist, ma_periods):
     for i, period in enumerate(ma_periods):
         if f'MA_{period}' in hist.columns:
             fig.add_trace(
-                go.Scatter(
+                go.Scattergl(
                     x=hist.index,
                     y=hist[f'MA_{period}'],
                     name=f'{period}-day MA',
@@ -247,7 +248,7 @@ def show_oscillators(hist, show_rsi=False, show_macd=False):
         
         # Add RSI trace
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['RSI'],
                 name='RSI',
@@ -268,7 +269,7 @@ def show_oscillators(hist, show_rsi=False, show_macd=False):
         
         if 'MACD' in hist.columns and 'Signal' in hist.columns and 'Histogram' in hist.columns:
             fig.add_trace(
-                go.Scatter(
+                go.Scattergl(
                     x=hist.index,
                     y=hist['MACD'],
                     name='MACD',
@@ -278,7 +279,7 @@ def show_oscillators(hist, show_rsi=False, show_macd=False):
             )
             
             fig.add_trace(
-                go.Scatter(
+                go.Scattergl(
                     x=hist.index,
                     y=hist['Signal'],
                     name='Signal',
@@ -288,7 +289,7 @@ def show_oscillators(hist, show_rsi=False, show_macd=False):
             )
             
             # Add histogram
-            colors = ['green' if val >= 0 else 'red' for val in hist['Histogram']]
+            colors = np.where(hist['Histogram'].to_numpy() >= 0, 'green', 'red')
             fig.add_trace(
                 go.Bar(
                     x=hist.index,
@@ -373,16 +374,14 @@ def show_volatility_indicators(hist, show_bollinger=False, show_volatility=False
     
     if show_bollinger:
         # Calculate Bollinger Bands
-        hist['MA_20'] = hist['Close'].rolling(window=20).mean()
-        hist['Upper_Band'] = hist['MA_20'] + (hist['Close'].rolling(window=20).std() * 2)
-        hist['Lower_Band'] = hist['MA_20'] - (hist['Close'].rolling(window=20).std() * 2)
+        hist['MA_20'], hist['Upper_Band'], hist['Lower_Band'] = calculate_bollinger_bands(hist['Close'], window=20, num_std=2)
         
         # Create figure for Bollinger Bands
         bb_fig = go.Figure()
         
         # Add price
         bb_fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['Close'],
                 name='Close Price',
@@ -392,7 +391,7 @@ def show_volatility_indicators(hist, show_bollinger=False, show_volatility=False
         
         # Add Bollinger Bands
         bb_fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['MA_20'],
                 name='20-day MA',
@@ -401,7 +400,7 @@ def show_volatility_indicators(hist, show_bollinger=False, show_volatility=False
         )
         
         bb_fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['Upper_Band'],
                 name='Upper Band',
@@ -411,7 +410,7 @@ def show_volatility_indicators(hist, show_bollinger=False, show_volatility=False
         )
         
         bb_fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['Lower_Band'],
                 name='Lower Band',
@@ -449,7 +448,7 @@ def show_volatility_indicators(hist, show_bollinger=False, show_volatility=False
         
         # Add volatility trace
         vol_fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['Volatility_20'],
                 name='20-day Volatility',
@@ -460,7 +459,7 @@ def show_volatility_indicators(hist, show_bollinger=False, show_volatility=False
         
         # Add ATR trace
         vol_fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['ATR'],
                 name='ATR (14)',
@@ -556,7 +555,7 @@ def show_support_resistance(hist):
         
         # Add price
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=hist.index,
                 y=hist['Close'],
                 name='Close Price',
@@ -650,19 +649,57 @@ def show_support_resistance(hist):
 
 # Helper functions for technical analysis
 
+# Indicator kernels are cached on the close-price array so reruns skip recomputation
+
+def _kernels(close):
+    """Pick the GPU kernels for very long histories when enabled, otherwise the numba ones."""
+    return _indicators_gpu if _indicators_gpu.is_enabled(len(close)) else _indicators
+
+
+@st.cache_data(show_spinner=False)
+def _cached_sma(close, windows):
+    return _kernels(close).sma(close, np.asarray(windows, dtype=np.int64))
+
+
+@st.cache_data(show_spinner=False)
+def _cached_rsi(close, periods):
+    return _kernels(close).rsi(close, periods)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_macd(close, fast, slow, signal):
+    return _kernels(close).macd(close, fast, slow, signal)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_bollinger(close, window, num_std):
+    return _kernels(close).bollinger(close, window, num_std)
+
+
+@log_function_call
+def calculate_moving_averages(prices, windows):
+    """Calculate simple moving averages for several windows, returned as {window: Series}."""
+    logger.info(f"Calculating moving averages for windows {windows}")
+    
+    try:
+        windows = tuple(sorted(set(windows)))
+        averages = _cached_sma(prices.to_numpy(dtype=np.float64), windows)
+        
+        logger.info("Moving averages calculation completed successfully")
+        return {window: pd.Series(values, index=prices.index) for window, values in zip(windows, averages)}
+    
+    except Exception as e:
+        logger.error(f"Error calculating moving averages: {str(e)}\n{traceback.format_exc()}")
+        raise
+
+
 @log_function_call
 def calculate_rsi(prices, periods=14):
     """Calculate Relative Strength Index."""
     logger.info(f"Calculating RSI with period {periods}")
     
     try:
-        delta = prices.diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.rolling(window=periods).mean()
-        avg_loss = loss.rolling(window=periods).mean()
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        rsi = pd.Series(_cached_rsi(prices.to_numpy(dtype=np.float64), periods), index=prices.index)
         
         logger.info("RSI calculation completed successfully")
         return rsi
@@ -678,11 +715,7 @@ def calculate_macd(df, fast=12, slow=26, signal=9):
     logger.info(f"Calculating MACD with fast={fast}, slow={slow}, signal={signal}")
     
     try:
-        df['EMA_fast'] = df['Close'].ewm(span=fast, adjust=False).mean()
-        df['EMA_slow'] = df['Close'].ewm(span=slow, adjust=False).mean()
-        df['MACD'] = df['EMA_fast'] - df['EMA_slow']
-        df['Signal'] = df['MACD'].ewm(span=signal, adjust=False).mean()
-        df['Histogram'] = df['MACD'] - df['Signal']
+        df['MACD'], df['Signal'], df['Histogram'] = _cached_macd(df['Close'].to_numpy(dtype=np.float64), fast, slow, signal)
         
         logger.info("MACD calculation completed successfully")
         return df
@@ -692,6 +725,22 @@ def calculate_macd(df, fast=12, slow=26, signal=9):
         raise
 
 
+@log_function_call
+def calculate_bollinger_bands(prices, window=20, num_std=2):
+    """Calculate Bollinger Bands (middle, upper and lower band)."""
+    logger.info(f"Calculating Bollinger Bands with window {window} and {num_std} standard deviations")
+    
+    try:
+        bands = _cached_bollinger(prices.to_numpy(dtype=np.float64), window, float(num_std))
+        
+        logger.info("Bollinger Bands calculation completed successfully")
+        return tuple(pd.Series(band, index=prices.index) for band in bands)
+    
+    except Exception as e:
+        logger.error(f"Error calculating Bollinger Bands: {str(e)}\n{traceback.format_exc()}")
+        raise
+
+
 @log_function_call
 def calculate_atr(df, window=14):
     """Calculate Average True Range."""
@@ -1,11 +1,17 @@
 import streamlit as st
+import os
+import re
 import time
+import threading
 import random
-from functools import wraps
+from functools import wraps, lru_cache
 import yfinance as yf
 import pandas as pd
 import logging
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from datetime import datetime, timedelta, time as dtime
+from zoneinfo import ZoneInfo
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -16,49 +22,101 @@ logger = logging.getLogger(__name__)
 
 # Global session for rate limiting
 _session = None
+_session_lock = threading.Lock()  # Guards lazy session creation from worker threads
 _last_request_time = datetime.min
+_rate_limit_lock = threading.Lock()  # Guards slot reservation across fetch threads
 _min_request_interval = 2.0  # Minimum seconds between requests
 
+_ticker_ttl = 300  # Seconds before a cached Ticker is rebuilt
+
+# Maximum number of symbols per yf.download request
+_batch_size = 20
+
+# On-disk Parquet cache of price histories so server restarts don't refetch everything
+_history_cache_dir = os.path.join(os.path.expanduser('~'), '.finance-tracker', 'cache', 'history')
+
+# US trading hours in New York time. Outside them a history fetched after the last close stays
+# current, so the disk cache only serves and stores completed sessions; the close is padded so
+# late closing prints have settled
+_market_tz = ZoneInfo('America/New_York')
+_market_open = dtime(9, 30)
+_market_settled = dtime(16, 30)
+
 def get_session():
     """Get a session with retry strategy"""
     global _session
-    if _session is None:
-        _session = requests.Session()
-        
-        # Configure retry strategy
-        retries = Retry(
-            total=5,  # Total number of retries
-            backoff_factor=2,  # Will wait: {backoff_factor} * (2 ** ({number_of_total_retries} - 1))
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"]
-        )
-        
-        adapter = HTTPAdapter(max_retries=retries)
-        _session.mount("http://", adapter)
-        _session.mount("https://", adapter)
-        
-        # Set default headers
-        _session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            
+            # Configure retry strategy
+            retries = Retry(
+                total=5,  # Total number of retries
+                backoff_factor=2,  # Will wait: {backoff_factor} * (2 ** ({number_of_total_retries} - 1))
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["HEAD", "GET", "OPTIONS"]
+            )
+            
+            # Keep enough pooled connections per host for the concurrent fetch threads
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=retries)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            
+            # Set default headers
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            })
+            _session = session
     
     return _session
 
+@lru_cache(maxsize=256)
+def _build_ticker(ticker_symbol, ttl_bucket):
+    """Create a yfinance Ticker bound to the shared session"""
+    stock = yf.Ticker(ticker_symbol)
+    stock._session = get_session()
+    return stock
+
+def get_ticker(ticker_symbol):
+    """Get a process-wide cached yfinance Ticker, rebuilt every _ticker_ttl seconds"""
+    # The bucket changes once per TTL window, so stale Tickers age out of the LRU
+    return _build_ticker(ticker_symbol, int(time.time() // _ticker_ttl))
+
+def _compact_ohlcv(df):
+    """Store volume as int64; prices stay float64 so cents survive at any share price"""
+    if 'Volume' in df.columns:
+        df['Volume'] = df['Volume'].fillna(0).astype('int64')
+    return df
+
+def script_thread_pool(max_workers):
+    """Thread pool whose workers share the calling script's ScriptRunContext, so st.cache_data fetches work in them"""
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx()))
+
 def rate_limit_request():
-    """Ensure minimum delay between requests"""
+    """Ensure minimum delay between request starts, waiting outside the lock"""
     global _last_request_time
-    current_time = datetime.now()
-    time_since_last_request = (current_time - _last_request_time).total_seconds()
+    # Reserve the next free slot under the lock, then sleep until it without blocking other threads
+    with _rate_limit_lock:
+        current_time = datetime.now()
+        slot = max(current_time, _last_request_time + timedelta(seconds=_min_request_interval))
+        _last_request_time = slot
     
-    if time_since_last_request < _min_request_interval:
-        sleep_time = _min_request_interval - time_since_last_request
+    sleep_time = (slot - current_time).total_seconds()
+    if sleep_time > 0:
         time.sleep(sleep_time)
-    
-    _last_request_time = datetime.now()
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_stock_info(ticker_symbol, max_retries=5, initial_delay=2):
     """Get stock information with improved rate limiting and caching"""
+    # Failures raise inside the cached fetch so they are retried on the next call instead of cached
+    try:
+        return _fetch_stock_info(ticker_symbol, max_retries, initial_delay)
+    except Exception as e:
+        logger.warning(f"No stock info available for {ticker_symbol}: {str(e)}")
+        return None
+
+@st.cache_data(ttl=900, show_spinner=False)  # Cache for 15 minutes
+def _fetch_stock_info(ticker_symbol, max_retries, initial_delay):
+    """Fetch stock information with retries, raising when none could be fetched"""
     for attempt in range(max_retries):
         try:
             # Apply rate limiting
@@ -71,9 +129,8 @@ def get_stock_info(ticker_symbol, max_retries=5, initial_delay=2):
                 logger.info(f"Retry attempt {attempt + 1}/{max_retries} after {delay:.2f}s delay")
                 time.sleep(delay)
             
-            # Use custom session
-            stock = yf.Ticker(ticker_symbol)
-            stock._session = get_session()
+            # Use cached Ticker with custom session
+            stock = get_ticker(ticker_symbol)
             info = stock.info
             
             if info:
@@ -84,14 +141,14 @@ def get_stock_info(ticker_symbol, max_retries=5, initial_delay=2):
                 logger.warning(f"Rate limited by Yahoo Finance (attempt {attempt + 1}/{max_retries})")
                 if attempt == max_retries - 1:
                     logger.error("Max retries reached for Yahoo Finance API")
-                    return None
+                    raise
             else:
                 logger.error(f"Error fetching stock info: {str(e)}")
-                return None
+                raise
     
-    return None
+    raise LookupError(f"Yahoo Finance returned no info for {ticker_symbol}")
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
 def get_stock_news(ticker_symbol, max_retries=5, initial_delay=2):
     """Get stock news with improved rate limiting and caching"""
     for attempt in range(max_retries):
@@ -106,9 +163,8 @@ def get_stock_news(ticker_symbol, max_retries=5, initial_delay=2):
                 logger.info(f"Retry attempt {attempt + 1}/{max_retries} after {delay:.2f}s delay")
                 time.sleep(delay)
             
-            # Use custom session
-            stock = yf.Ticker(ticker_symbol)
-            stock._session = get_session()
+            # Use cached Ticker with custom session
+            stock = get_ticker(ticker_symbol)
             
             try:
                 # Try to get news directly from the news property
@@ -177,37 +233,166 @@ def get_stock_news(ticker_symbol, max_retries=5, initial_delay=2):
     
     return None
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+def _history_cache_path(ticker_symbol, period, interval):
+    """Path of the on-disk cache file for one history request"""
+    name = re.sub(r'[^A-Za-z0-9.=^-]', '_', f"{ticker_symbol}_{period}_{interval}")
+    return os.path.join(_history_cache_dir, f"{name}.parquet")
+
+def _in_market_session(now):
+    """Whether prices may still change at now (New York time); exchange holidays count as weekdays"""
+    return now.weekday() < 5 and _market_open <= now.time() < _market_settled
+
+def _last_settled_close(now):
+    """Most recent weekday close at or before now (New York time), once its prices have settled"""
+    close = now.replace(hour=_market_settled.hour, minute=_market_settled.minute, second=0, microsecond=0)
+    if close > now:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
+
+def _load_cached_history(ticker_symbol, period, interval):
+    """Read a history from the on-disk cache if it was fetched after the last completed session"""
+    # During a session prices move, so only the in-process cache is used
+    now = datetime.now(_market_tz)
+    if _in_market_session(now):
+        return None
+    
+    path = _history_cache_path(ticker_symbol, period, interval)
+    if not os.path.exists(path) or os.path.getmtime(path) < _last_settled_close(now).timestamp():
+        return None
+    
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        logger.warning(f"Could not read history cache for {ticker_symbol}: {str(e)}")
+        return None
+
+def _store_cached_history(ticker_symbol, period, interval, df):
+    """Write a completed-session history to the on-disk cache, replacing any previous file atomically"""
+    # Histories fetched mid-session would be stale before they could be read back
+    if _in_market_session(datetime.now(_market_tz)):
+        return
+    
+    path = _history_cache_path(ticker_symbol, period, interval)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(_history_cache_dir, exist_ok=True)
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not write history cache for {ticker_symbol}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
 def get_stock_history(ticker_symbol, period="1y", interval="1d"):
     """Get stock price history with rate limiting and caching"""
+    cached = _load_cached_history(ticker_symbol, period, interval)
+    if cached is not None:
+        return cached
+    
     try:
         # Apply rate limiting
         rate_limit_request()
         
-        # Use custom session
-        stock = yf.Ticker(ticker_symbol)
-        stock._session = get_session()
+        # Use cached Ticker with custom session
+        stock = get_ticker(ticker_symbol)
         df = stock.history(period=period, interval=interval)
         
         if df.empty:
             return None
-            
+        
+        df = _compact_ohlcv(df)
+        _store_cached_history(ticker_symbol, period, interval, df)
         return df
         
     except Exception as e:
         logger.error(f"Error fetching stock history: {str(e)}")
         return None
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+def _download_batch(tickers, period, interval):
+    """Download one batch of tickers and split the result per symbol"""
+    try:
+        # Apply rate limiting
+        rate_limit_request()
+        
+        df = yf.download(
+            " ".join(tickers),
+            period=period,
+            interval=interval,
+            group_by='ticker',
+            auto_adjust=True,
+            ignore_tz=False,
+            threads=True,
+            progress=False
+        )
+    except Exception as e:
+        logger.error(f"Error downloading history for {', '.join(tickers)}: {str(e)}")
+        return {}
+    
+    histories = {}
+    if df is None or df.empty:
+        return histories
+    
+    for ticker in tickers:
+        if isinstance(df.columns, pd.MultiIndex):
+            if ticker not in df.columns.get_level_values(0):
+                continue
+            hist = df[ticker]
+        else:
+            hist = df
+        
+        # Drop dates that only exist for other tickers in the batch
+        hist = hist.dropna(how='all')
+        if not hist.empty:
+            histories[ticker] = _compact_ohlcv(hist.copy())
+    
+    return histories
+
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
+def get_batch_history(tickers, period="1y", interval="1d"):
+    """Get price history for several tickers using batched downloads and caching"""
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    
+    # Serve what we can from the on-disk cache and only download the rest
+    histories = {}
+    for ticker in tickers:
+        cached = _load_cached_history(ticker, period, interval)
+        if cached is not None:
+            histories[ticker] = cached
+    to_fetch = [ticker for ticker in tickers if ticker not in histories]
+    
+    # Yahoo accepts up to 20 symbols per request, so download in parallel batches
+    batches = [to_fetch[i:i + _batch_size] for i in range(0, len(to_fetch), _batch_size)]
+    
+    if batches:
+        with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+            for batch_histories in executor.map(lambda batch: _download_batch(batch, period, interval), batches):
+                for ticker, hist in batch_histories.items():
+                    _store_cached_history(ticker, period, interval, hist)
+                histories.update(batch_histories)
+    
+    # Keep the caller's ticker order regardless of which source each history came from
+    histories = {ticker: histories[ticker] for ticker in tickers if ticker in histories}
+    
+    missing = [ticker for ticker in tickers if ticker not in histories]
+    if missing:
+        logger.warning(f"No history data available for {', '.join(missing)}")
+    
+    return histories
+
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour; statements only change quarterly
 def get_stock_financials(ticker_symbol):
     """Get stock financial data with rate limiting and caching"""
     try:
         # Apply rate limiting
         rate_limit_request()
         
-        # Use custom session
-        stock = yf.Ticker(ticker_symbol)
-        stock._session = get_session()
+        # Use cached Ticker with custom session
+        stock = get_ticker(ticker_symbol)
         
         # Get financial statements with more detailed error handling
         try: